@@ -0,0 +1,116 @@
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server")
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def latency_summary(latencies):
+    """Latencije u sekundama -> p50/p95/p99/max u milisekundama."""
+    values = sorted(latencies)
+    summary = {"count": len(values)}
+    for name, p in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99), ("max_ms", 100)):
+        value = percentile(values, p)
+        summary[name] = round(value * 1000, 3) if value is not None else None
+    return summary
+
+
+def time_calls(fn, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalServer:
+    """Pokreće server (uvicorn) u zasebnom procesu, bez Dockera i LocalStacka."""
+
+    def __init__(self, env=None, port=None, startup_timeout=600):
+        self.port = port or free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = dict(os.environ, **(env or {}))
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.startup_seconds = None
+
+    def __enter__(self):
+        start = time.perf_counter()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(self.port), "--log-level", "warning"],
+            cwd=SERVER_DIR,
+            env=self.env,
+            # Ispis servera ide na stderr, da stdout ostane čisti JSON rezultata
+            stdout=sys.stderr,
+        )
+        while True:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server je završio s kodom {self.process.returncode}")
+            try:
+                requests.get(self.url + "/", timeout=1)
+                break
+            except requests.exceptions.ConnectionError:
+                if time.perf_counter() - start > self.startup_timeout:
+                    self.__exit__(None, None, None)
+                    raise RuntimeError("Server se nije pokrenuo na vrijeme")
+                time.sleep(0.1)
+        self.startup_seconds = round(time.perf_counter() - start, 3)
+        return self
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SERVER_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, benchmark, config, results):
+    """Rezultati kao JSON, s podacima o buildu za usporedbu između verzija."""
+    report = {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "started_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return report
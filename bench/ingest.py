@@ -0,0 +1,159 @@
+"""Generator opterećenja za POST /readings i POST /readings/batch.
+
+Primjeri:
+    python ingest.py --backend memory --rate 500 --concurrency 32 --duration 30
+    python ingest.py --backend sqlite --batch-size 25 --output ingest.json
+    python ingest.py --url http://localhost:8000 --rate 200
+    python ingest.py --batch-size 100 --wire-format msgpack
+
+Bez --url pokreće lokalni server sa zadanim spremištem (memory/sqlite), pa
+za mjerenje nije potrebna mreža ni LocalStack. Uz --rate zahtjevi se šalju
+po rasporedu (open loop) i latencija se mjeri od planiranog trenutka slanja,
+tako da zagušenje servera ne skriva čekanje u redu.
+"""
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+import requests
+
+from common import LocalServer, latency_summary, write_results
+from payloads import live_readings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "nodes"))
+from node_client import ENCODERS  # noqa: E402
+
+
+class LoadGenerator:
+    def __init__(self, url, rate, concurrency, duration, total, batch_size, seed, wire_format="json"):
+        self.url = url.rstrip("/") + ("/readings/batch" if batch_size else "/readings")
+        self.rate = rate
+        self.concurrency = concurrency
+        self.duration = duration
+        self.total = total
+        self.batch_size = batch_size
+        self.encode = ENCODERS[wire_format]
+        self.readings = live_readings(seed)
+        self.lock = threading.Lock()
+        self.sent = itertools.count()
+        self.latencies = []
+        self.status_codes = Counter()
+        self.errors = 0
+        self.readings_sent = 0
+        self.bytes_sent = 0
+
+    def _next_request(self):
+        """(planirano vrijeme slanja, tijelo) ili None kad je mjerenje gotovo."""
+        with self.lock:
+            index = next(self.sent)
+            if self.total and index >= self.total:
+                return None
+            scheduled = self.started + index / self.rate if self.rate else time.perf_counter()
+            if scheduled - self.started >= self.duration:
+                return None
+            if self.batch_size:
+                body = list(itertools.islice(self.readings, self.batch_size))
+            else:
+                body = next(self.readings)
+            return scheduled, body
+
+    def _worker(self):
+        session = requests.Session()
+        while True:
+            request = self._next_request()
+            if request is None:
+                return
+            scheduled, payload = request
+            # Kodiranje je dio mjerenja, kao kod čvora koji šalje
+            body, headers = self.encode(payload)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            failed = False
+            try:
+                response = session.post(self.url, data=body, headers=headers, timeout=30)
+                status = response.status_code
+                failed = status != 200 or response.json().get("status") == "error"
+            except (requests.exceptions.RequestException, ValueError):
+                status = "exception"
+                failed = True
+            latency = time.perf_counter() - scheduled
+
+            with self.lock:
+                self.latencies.append(latency)
+                self.status_codes[str(status)] += 1
+                self.readings_sent += len(payload) if self.batch_size else 1
+                self.bytes_sent += len(body)
+                if failed:
+                    self.errors += 1
+
+    def run(self):
+        self.started = time.perf_counter()
+        workers = [threading.Thread(target=self._worker) for _ in range(self.concurrency)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - self.started
+
+        requests_done = len(self.latencies)
+        return {
+            "requests": requests_done,
+            "readings": self.readings_sent,
+            "elapsed_seconds": round(elapsed, 3),
+            "requests_per_second": round(requests_done / elapsed, 1) if elapsed else None,
+            "readings_per_second": round(self.readings_sent / elapsed, 1) if elapsed else None,
+            "bytes_per_reading": round(self.bytes_sent / self.readings_sent, 1) if self.readings_sent else None,
+            "error_rate": round(self.errors / requests_done, 4) if requests_done else None,
+            "status_codes": dict(self.status_codes),
+            "latency": latency_summary(self.latencies),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="postojeći server; bez toga se pokreće lokalni")
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--rate", type=float, default=0, help="zahtjeva u sekundi (0 = koliko server stigne)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10, help="trajanje u sekundama")
+    parser.add_argument("--requests", type=int, default=0, help="najviše zahtjeva (0 = bez ograničenja)")
+    parser.add_argument("--batch-size", type=int, default=0, help="očitanja po /readings/batch (0 = POST /readings)")
+    parser.add_argument("--wire-format", choices=sorted(ENCODERS), default="json", help="format tijela zahtjeva")
+    parser.add_argument("--write-behind", action="store_true", help="lokalni server s WRITE_BEHIND=1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON datoteka s rezultatima")
+    args = parser.parse_args()
+
+    config = vars(args).copy()
+    with tempfile.TemporaryDirectory() as tmp:
+        server = nullcontext()
+        if not args.url:
+            server = LocalServer(env={
+                "STORAGE_BACKEND": args.backend,
+                "SQLITE_PATH": os.path.join(tmp, "readings.db"),
+                "WRITE_BEHIND": "1" if args.write_behind else "0",
+                # Mjeri se propusnost servera, pa se ograničenje po kameri isključuje
+                "INGEST_RATE": "0",
+            })
+
+        with server:
+            url = args.url or server.url
+            generator = LoadGenerator(
+                url, args.rate, args.concurrency, args.duration, args.requests, args.batch_size, args.seed,
+                args.wire_format,
+            )
+            results = generator.run()
+
+    write_results(args.output, "ingest", config, results)
+
+
+if __name__ == "__main__":
+    main()
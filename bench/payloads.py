@@ -0,0 +1,114 @@
+import random
+import string
+from datetime import datetime, timedelta
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+ENTRANCES = {
+    "RIJEKA-ENTRANCE": "Ulaz Rijeka",
+    "PULA-ENTRANCE": "Ulaz Pula",
+    "UMAG-ENTRANCE": "Ulaz Umag",
+}
+CAMERAS = {"CAMERA1": "Kamera Rijeka", "CAMERA2": "Kamera Pula"}
+EXITS = {
+    "RIJEKA-EXIT": "Izlaz Rijeka",
+    "PULA-EXIT": "Izlaz Pula",
+    "UMAG-EXIT": "Izlaz Umag",
+}
+RESTAREAS = {"RESTAREA1": "Odmorište 1", "RESTAREA2": "Odmorište 2"}
+
+
+def registration(rng):
+    # Isti oblik kao generate_random_registration u nodes/runtime.py
+    region = rng.choice(["PU", "RI", "ZG", "ST", "ZD", "OS"])
+    digits = "".join(rng.choices(string.digits, k=3))
+    letters = "".join(rng.choices(string.ascii_uppercase, k=2))
+    return f"{region}{digits}{letters}"
+
+
+def journey(rng, vehicle_id, entered_at):
+    """Očitanja jednog prolaza autocestom: ulaz, kamera, ponekad odmorište, izlaz."""
+    entrance = rng.choice(list(ENTRANCES))
+    camera = rng.choice(list(CAMERAS))
+    exit_id = rng.choice([e for e in EXITS if e.split("-")[0] != entrance.split("-")[0]])
+
+    camera_at = entered_at + timedelta(minutes=rng.randint(25, 60))
+    exit_at = camera_at + timedelta(minutes=rng.randint(20, 60))
+
+    readings = [
+        {
+            "camera_id": entrance,
+            "camera_location": ENTRANCES[entrance],
+            "vehicle_id": vehicle_id,
+            "timestamp": entered_at.strftime(TIMESTAMP_FORMAT),
+            "is_entrance": True,
+        },
+        {
+            "camera_id": camera,
+            "camera_location": CAMERAS[camera],
+            "vehicle_id": vehicle_id,
+            "timestamp": camera_at.strftime(TIMESTAMP_FORMAT),
+            "is_camera": True,
+            "speed": rng.randint(90, 130),
+            "speed_limit": 130,
+        },
+    ]
+    if rng.random() < 0.3:
+        restarea = rng.choice(list(RESTAREAS))
+        stop_at = camera_at + timedelta(minutes=rng.randint(5, 15))
+        readings.append({
+            "camera_id": restarea,
+            "camera_location": RESTAREAS[restarea],
+            "vehicle_id": vehicle_id,
+            "timestamp": stop_at.strftime(TIMESTAMP_FORMAT),
+            "is_restarea": True,
+            "timestamp_entrance": stop_at.strftime(TIMESTAMP_FORMAT),
+            "timestamp_exit": (stop_at + timedelta(minutes=rng.randint(5, 30))).strftime(TIMESTAMP_FORMAT),
+        })
+    readings.append({
+        "camera_id": exit_id,
+        "camera_location": EXITS[exit_id],
+        "vehicle_id": vehicle_id,
+        "timestamp": exit_at.strftime(TIMESTAMP_FORMAT),
+        "is_exit": True,
+        "timestamp_entrance": entered_at.strftime(TIMESTAMP_FORMAT),
+        "timestamp_exit": exit_at.strftime(TIMESTAMP_FORMAT),
+    })
+    return readings
+
+
+def live_readings(seed=0):
+    """Beskonačan niz očitanja s trenutnim vremenom, kakva šalju čvorovi."""
+    rng = random.Random(seed)
+    while True:
+        now = datetime.now()
+        for reading in journey(rng, registration(rng), now):
+            reading = dict(reading, timestamp=now.strftime(TIMESTAMP_FORMAT))
+            yield reading
+
+
+def dataset(size, seed=0, start=None, span=timedelta(days=30)):
+    """`size` očitanja raspoređenih kroz `span` do `start` (zadano: sada).
+
+    Vraća i popis vozila, da mjerenja mogu birati postojeća vozila.
+    """
+    rng = random.Random(seed)
+    end = start or datetime.now().replace(microsecond=0)
+    begin = end - span
+    seconds = int(span.total_seconds())
+    vehicles = []
+    produced = 0
+
+    def readings():
+        nonlocal produced
+        while produced < size:
+            vehicle_id = registration(rng) + str(len(vehicles))
+            vehicles.append(vehicle_id)
+            entered_at = begin + timedelta(seconds=rng.randrange(seconds))
+            for reading in journey(rng, vehicle_id, entered_at):
+                if produced >= size:
+                    return
+                produced += 1
+                yield reading
+
+    return readings(), vehicles
@@ -0,0 +1,136 @@
+"""Mjerenje /stats, /readings i can_enter pri različitim veličinama tablice.
+
+Primjer:
+    python reads.py --sizes 10000,100000,1000000,5000000 --output reads.json
+
+Za svaku veličinu puni se nova SQLite baza realističnim očitanjima, pokreće
+lokalni server nad njom (vrijeme pokretanja uključuje izgradnju statistike)
+i mjere se rute koje čitaju. can_enter se mjeri izravno nad spremištem, za
+vozila koja postoje i za ona kojih nema. Međuspremnik odgovora je isključen
+(RESPONSE_CACHE_TTL=0) osim uz --cache.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import requests
+
+from common import SERVER_DIR, LocalServer, time_calls, write_results
+from payloads import dataset, registration
+
+sys.path.insert(0, SERVER_DIR)
+# main stvara spremište pri uvozu; can_enter dobiva spremište kao argument
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+SEED_BATCH = 10000
+
+
+def seed(storage, size, seed_value):
+    readings, vehicles = dataset(size, seed_value)
+    batch = []
+    start = time.perf_counter()
+    for reading in readings:
+        batch.append(reading)
+        if len(batch) >= SEED_BATCH:
+            storage.put_batch(batch)
+            batch = []
+    if batch:
+        storage.put_batch(batch)
+    return vehicles, time.perf_counter() - start
+
+
+def bench_can_enter(storage, vehicles, repeat, seed_value):
+    from main import can_enter
+
+    rng = random.Random(seed_value)
+    existing = iter([rng.choice(vehicles) for _ in range(repeat)])
+    missing = iter([registration(rng) + "-X" for _ in range(repeat)])
+    return {
+        "existing_vehicle": time_calls(lambda: can_enter(next(existing), storage, hours=24 * 365), repeat),
+        "missing_vehicle": time_calls(lambda: can_enter(next(missing), storage, hours=24 * 365), repeat),
+    }
+
+
+def bench_http(url, size, repeat, full_scan_max):
+    session = requests.Session()
+
+    def get(path, **params):
+        response = session.get(url + path, params=params, timeout=3600)
+        response.raise_for_status()
+        return response
+
+    results = {
+        "stats": time_calls(lambda: get("/stats"), repeat),
+        "readings_first_page": time_calls(lambda: get("/readings", limit=1000), repeat),
+    }
+
+    # Deset uzastopnih stranica po 1000 očitanja preko cursora
+    def walk_pages():
+        cursor = None
+        for _ in range(10):
+            params = {"limit": 1000}
+            if cursor:
+                params["cursor"] = cursor
+            cursor = get("/readings", **params).json().get("next_cursor")
+            if not cursor:
+                return
+
+    results["readings_10_pages"] = time_calls(walk_pages, max(1, repeat // 10))
+
+    if size <= full_scan_max:
+        start = time.perf_counter()
+        lines = sum(1 for _ in get("/readings", format="ndjson").iter_lines())
+        elapsed = time.perf_counter() - start
+        results["readings_ndjson_full"] = {
+            "seconds": round(elapsed, 3),
+            "lines_per_second": round(lines / elapsed, 1),
+        }
+        results["stats_rebuild"] = time_calls(lambda: get("/stats", rebuild="true"), 1)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="veličine tablice, odvojene zarezom")
+    parser.add_argument("--repeat", type=int, default=50, help="ponavljanja po mjerenju")
+    parser.add_argument("--full-scan-max", type=int, default=1000000,
+                        help="najveća tablica za koju se mjeri čitanje cijele tablice")
+    parser.add_argument("--cache", action="store_true", help="ostavi uključen međuspremnik odgovora")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON datoteka s rezultatima")
+    args = parser.parse_args()
+
+    from storage_sqlite import SqliteStorage
+
+    results = []
+    for size in [int(s) for s in args.sizes.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "readings.db")
+            storage = SqliteStorage(path)
+            vehicles, seed_seconds = seed(storage, size, args.seed)
+            print(f"{size} očitanja upisano za {seed_seconds:.1f}s", file=sys.stderr)
+
+            result = {
+                "size": size,
+                "seed_seconds": round(seed_seconds, 3),
+                "can_enter": bench_can_enter(storage, vehicles, args.repeat, args.seed),
+            }
+            storage.close()
+
+            env = {"STORAGE_BACKEND": "sqlite", "SQLITE_PATH": path}
+            if not args.cache:
+                env["RESPONSE_CACHE_TTL"] = "0"
+            with LocalServer(env=env) as server:
+                result["startup_seconds"] = server.startup_seconds
+                result["http"] = bench_http(server.url, size, args.repeat, args.full_scan_max)
+            results.append(result)
+
+    write_results(args.output, "reads", vars(args).copy(), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+import time
+
+import requests
+
+STREAM_URL = "http://localhost:8000/readings/stream"
+
+
+def fetch_all_readings(url):
+    """Sva očitanja s GET /readings?format=ndjson, bez izravnog pristupa bazi."""
+    items = []
+    with requests.get(url, params={"format": "ndjson"}, stream=True, timeout=(5, 300)) as r:
+        r.raise_for_status()
+        for line in r.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            item = json.loads(line)
+            # Redak s cursorom nakon svake stranice nije očitanje
+            if "next_cursor" not in item:
+                items.append(item)
+    return items
+
+
+class ReadingFeed:
+    """Prati /readings/stream u pozadinskoj dretvi i skuplja nova očitanja.
+
+    Čvor umjesto skeniranja cijele tablice svakih 10 sekundi poziva `fetch`,
+    koji vraća samo očitanja pristigla od prošlog poziva. Cursor se sprema u
+    datoteku (`commit`), pa se čvor nakon ponovnog pokretanja nastavlja gdje
+    je stao. Tablica se skenira samo kad cursora nema ili server javi da su
+    događaji propušteni (gap).
+    """
+
+    def __init__(self, types, cursor_file, url=STREAM_URL):
+        self.types = types
+        self.cursor_file = cursor_file
+        self.url = url
+        self.lock = threading.Lock()
+        self.items = []
+        self.cursor = self._load_cursor()
+        self.resync = self.cursor is None
+        self.thread = None
+
+    def _load_cursor(self):
+        if os.path.exists(self.cursor_file) and os.path.getsize(self.cursor_file) > 0:
+            with open(self.cursor_file, "r") as f:
+                return f.read().strip() or None
+        return None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="reading-feed", daemon=True)
+        self.thread.start()
+
+    def fetch(self, scan_full_table):
+        with self.lock:
+            resync = self.resync
+            self.resync = False
+            items = self.items
+            self.items = []
+
+        if resync:
+            print("Čitam cijelu tablicu jer nema cursora za feed...")
+            return scan_full_table() + items
+        return items
+
+    def commit(self):
+        with self.lock:
+            cursor = self.cursor
+        if cursor:
+            with open(self.cursor_file, "w") as f:
+                f.write(cursor)
+
+    def _run(self):
+        delay = 1
+        while True:
+            try:
+                self._listen()
+                delay = 1
+            except requests.exceptions.RequestException:
+                print(f"Feed nije dostupan, ponovno spajanje za {delay}s...")
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def _listen(self):
+        headers = {"Accept": "text/event-stream"}
+        if self.cursor:
+            headers["Last-Event-ID"] = self.cursor
+
+        params = {"types": ",".join(self.types)}
+        with requests.get(self.url, params=params, headers=headers, stream=True, timeout=(5, 60)) as r:
+            r.raise_for_status()
+            event_id, event_type, data = None, None, []
+            for line in r.iter_lines(decode_unicode=True):
+                if line:
+                    field, _, value = line.partition(":")
+                    value = value[1:] if value.startswith(" ") else value
+                    if field == "id":
+                        event_id = value
+                    elif field == "event":
+                        event_type = value
+                    elif field == "data":
+                        data.append(value)
+                    continue
+
+                # Prazan redak završava jedan događaj
+                with self.lock:
+                    if event_type == "gap":
+                        self.resync = True
+                    elif data:
+                        self.items.append(json.loads("\n".join(data)))
+                    if event_id:
+                        self.cursor = event_id
+                event_id, event_type, data = None, None, []
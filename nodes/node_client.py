@@ -0,0 +1,81 @@
+import gzip
+import json
+import os
+import time
+import uuid
+
+import requests
+
+# json (zadano), msgpack ili ndjson-gzip
+WIRE_FORMAT = os.getenv("NODE_WIRE_FORMAT", "json")
+
+
+# Koderi primaju jedno očitanje (dict) ili popis očitanja, a vraćaju (tijelo, zaglavlja)
+def encode_json(payload):
+    return json.dumps(payload, separators=(",", ":")).encode(), {"Content-Type": "application/json"}
+
+
+def encode_msgpack(payload):
+    import msgpack
+
+    return msgpack.packb(payload, use_bin_type=True), {"Content-Type": "application/msgpack"}
+
+
+def encode_ndjson_gzip(payload):
+    readings = payload if isinstance(payload, list) else [payload]
+    body = "\n".join(json.dumps(reading, separators=(",", ":")) for reading in readings).encode()
+    return gzip.compress(body, compresslevel=5), {"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"}
+
+
+ENCODERS = {"json": encode_json, "msgpack": encode_msgpack, "ndjson-gzip": encode_ndjson_gzip}
+
+
+class NodeClient:
+    """Slanje očitanja serveru preko jedne HTTP veze (keep-alive), u odabranom formatu.
+
+    Svako očitanje dobiva reading_id prije prvog slanja, pa se nakon prekida
+    veze ili odgovora s Retry-After (npr. 503 kad je red za upis pun) smije
+    poslati ponovno: server ga upisuje samo jednom.
+    """
+
+    def __init__(self, url, wire_format=WIRE_FORMAT, retries=3, timeout=10, pool_size=None):
+        self.url = url.rstrip("/")
+        self.encode = ENCODERS[wire_format]
+        self.retries = retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        if pool_size:
+            # Više dretvi dijeli istu sesiju, pa svaka treba svoju vezu u bazenu
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+
+    def send(self, reading):
+        """POST /readings s jednim očitanjem."""
+        return self._post(self.url, self._with_id(reading))
+
+    def send_batch(self, readings):
+        """POST /readings/batch s više očitanja u jednom zahtjevu."""
+        return self._post(self.url + "/batch", [self._with_id(reading) for reading in readings])
+
+    @staticmethod
+    def _with_id(reading):
+        return dict(reading, reading_id=reading.get("reading_id") or uuid.uuid4().hex)
+
+    def _post(self, url, payload):
+        body, headers = self.encode(payload)
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(url, data=body, headers=headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.retries:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
+                continue
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is None or attempt == self.retries:
+                return response
+            time.sleep(float(retry_after))
+
+    def close(self):
+        self.session.close()
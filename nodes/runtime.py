@@ -0,0 +1,373 @@
+"""Svi čvorovi (ulazi, kamere, izlazi i odmorišta) u jednom asyncio procesu.
+
+Primjeri:
+    python runtime.py
+    python runtime.py moja_topologija.json --api-url http://server:8000/readings
+
+Topologija (topology.json) opisuje čvorove: id, tip, lokaciju, vremena
+putovanja i vjerojatnosti po ulazu iz kojeg vozilo dolazi (`sources`).
+Nova očitanja se dohvaćaju jednom po ciklusu za sve čvorove, a sva slanja
+idu kroz isti bazen HTTP veza, pa jedan proces može simulirati stotine
+kamera.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import string
+from datetime import datetime, timedelta
+
+import requests
+
+from feed_client import ReadingFeed, fetch_all_readings
+from node_client import NodeClient
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Najviše očitanja u jednom POST /readings/batch
+BATCH_SIZE = int(os.getenv("NODE_BATCH_SIZE", "100"))
+# Istodobni zahtjevi prema serveru (i veličina bazena veza)
+HTTP_CONCURRENCY = int(os.getenv("NODE_HTTP_CONCURRENCY", "8"))
+
+
+def is_true(value):
+    return str(value).lower() == "true"
+
+
+def parse_time(timestamp):
+    try:
+        return datetime.strptime(timestamp or "", TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def reading_key(item):
+    return f"{item.get('camera_id')}|{item.get('vehicle_id')}|{item.get('timestamp')}"
+
+
+def generate_random_registration():
+    region = random.choice(["PU", "RI", "ZG", "ST", "ZD", "OS"])
+    digits = "".join(random.choices(string.digits, k=3))
+    letters = "".join(random.choices(string.ascii_uppercase, k=2))
+    return f"{region}{digits}{letters}"
+
+
+class EntranceNode:
+    """Ulaz: novo vozilo svakih `interval` sekundi (povremeno ± `jitter`)."""
+
+    def __init__(self, config):
+        self.id = config["id"]
+        self.location = config["location"]
+        self.interval = config.get("interval", 30)
+        self.jitter = config.get("jitter", 5)
+        self.jitter_chance = config.get("jitter_chance", 0.1)
+
+    def generate(self):
+        return {
+            "camera_id": self.id,
+            "camera_location": self.location,
+            "vehicle_id": generate_random_registration(),
+            "timestamp": datetime.now().strftime(TIMESTAMP_FORMAT),
+            "is_entrance": True,
+        }
+
+    async def run(self, runtime):
+        # Ulazi ne kreću istodobno, da stotine čvorova ne šalje u istoj sekundi
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while True:
+            await runtime.send([self.generate()])
+            delay = self.interval
+            # simuliranje "slučajne greške" u vremenu, da ne bude pravilno svakih `interval` sekundi
+            if random.random() < self.jitter_chance:
+                delay += random.choice([-self.jitter, self.jitter])
+            await asyncio.sleep(max(1, delay))
+
+
+class CheckpointNode:
+    """Kamera ili izlaz: očitanje za vozila s ulaza iz `sources` koja prolaze ovuda.
+
+    Pravilo za ulaz: `minutes` (vrijeme putovanja, ± `variation`), te
+    `probability`, `requires` i `unless` za odluku o prolasku (RouteTable).
+    """
+
+    def __init__(self, config):
+        self.id = config["id"]
+        self.type = config["type"]
+        self.location = config["location"]
+        self.sources = config["sources"]
+        self.variation = config.get("variation", 5)
+        self.speed = config.get("speed", [90, 130])
+        self.speed_limit = config.get("speed_limit", 130)
+
+    def process(self, item, routes):
+        rule = self.sources.get(item.get("camera_id"))
+        if not rule or not is_true(item.get("is_entrance")):
+            return None
+        entry_time = parse_time(item.get("timestamp"))
+        if entry_time is None or not routes.passes(self.id, item):
+            return None
+
+        travel_time = rule["minutes"] + random.randint(-self.variation, self.variation)
+        reading = {
+            "camera_id": self.id,
+            "camera_location": self.location,
+            "vehicle_id": item["vehicle_id"],
+            "timestamp": (entry_time + timedelta(minutes=travel_time)).strftime(TIMESTAMP_FORMAT),
+        }
+        if self.type == "camera":
+            reading.update(is_camera=True, speed=random.randint(*self.speed), speed_limit=self.speed_limit)
+        else:
+            reading["is_exit"] = True
+        return reading
+
+
+class RestAreaNode:
+    """Odmorište: zaustavljanje nakon ulaza (`after_minutes`) ili prije izlaza (`before_minutes`)."""
+
+    def __init__(self, config):
+        self.id = config["id"]
+        self.location = config["location"]
+        self.sources = config["sources"]
+        self.stop_minutes = config.get("stop_minutes", [15, 30])
+
+    def process(self, item, routes):
+        rule = self.sources.get(item.get("camera_id"))
+        if not rule:
+            return None
+        seen_at = parse_time(item.get("timestamp"))
+        if seen_at is None or random.random() > rule.get("probability", 1.0):
+            return None
+
+        stop_time = timedelta(minutes=random.randint(*self.stop_minutes))
+        if "after_minutes" in rule and is_true(item.get("is_entrance")):
+            rest_entry = seen_at + timedelta(minutes=random.randint(*rule["after_minutes"]))
+            rest_exit = rest_entry + stop_time
+        elif "before_minutes" in rule and is_true(item.get("is_exit")):
+            rest_exit = seen_at - timedelta(minutes=random.randint(*rule["before_minutes"]))
+            rest_entry = rest_exit - stop_time
+        else:
+            return None
+
+        return {
+            "camera_id": self.id,
+            "camera_location": self.location,
+            "vehicle_id": item["vehicle_id"],
+            "is_restarea": True,
+            "timestamp_entrance": rest_entry.strftime(TIMESTAMP_FORMAT),
+            "timestamp_exit": rest_exit.strftime(TIMESTAMP_FORMAT),
+        }
+
+
+NODE_TYPES = {"entrance": EntranceNode, "camera": CheckpointNode, "exit": CheckpointNode, "restarea": RestAreaNode}
+
+
+class RouteTable:
+    """Odluke kroz koje kamere i izlaze prolazi vozilo s određenog ulaza, zajedničke svim čvorovima.
+
+    Odluka se donosi jednom po ulazu vozila i točki. Pravilo koje ovisi o
+    drugim točkama (`requires`, `unless`) prvo izračuna njihove odluke, pa
+    redoslijed čvorova u topologiji nije bitan.
+    """
+
+    def __init__(self, checkpoints):
+        self.checkpoints = checkpoints
+        self.decisions = {}
+
+    def passes(self, point_id, item):
+        key = (reading_key(item), point_id)
+        if key not in self.decisions:
+            rule = self.checkpoints[point_id].sources.get(item["camera_id"])
+            self.decisions[key] = bool(rule) and (
+                all(self.passes(required, item) for required in rule.get("requires", []))
+                and not any(self.passes(excluded, item) for excluded in rule.get("unless", []))
+                and random.random() < rule.get("probability", 1.0)
+            )
+        return self.decisions[key]
+
+
+def longest_travel_minutes(nodes):
+    """Najdulje vrijeme od ulaza do bilo kojeg očitanja koje se iz njega generira."""
+    minutes = [0]
+    for node in nodes:
+        if isinstance(node, CheckpointNode):
+            minutes += [rule["minutes"] + node.variation for rule in node.sources.values()]
+        elif isinstance(node, RestAreaNode):
+            minutes += [
+                max(rule.get("after_minutes", [0]) + rule.get("before_minutes", [0])) + node.stop_minutes[1]
+                for rule in node.sources.values()
+            ]
+    return max(minutes)
+
+
+def load_topology(path):
+    with open(path, "r", encoding="utf-8") as f:
+        topology = json.load(f)
+
+    nodes = []
+    for config in topology["nodes"]:
+        if config.get("type") not in NODE_TYPES:
+            raise ValueError(f"Čvor {config.get('id')}: nepoznat tip {config.get('type')}")
+        nodes.append(NODE_TYPES[config["type"]](config))
+
+    checkpoints = {node.id: node for node in nodes if isinstance(node, CheckpointNode)}
+    for node in checkpoints.values():
+        for origin, rule in node.sources.items():
+            for point_id in rule.get("requires", []) + rule.get("unless", []):
+                if point_id not in checkpoints:
+                    raise ValueError(f"Čvor {node.id}: {point_id} nije kamera ni izlaz")
+
+    # RouteTable razrješava pravila rekurzivno, pa za isti ulaz ne smije biti kružnih ovisnosti
+    def check_cycle(point_id, origin, path):
+        if point_id in path:
+            raise ValueError(f"Kružna ovisnost za {origin}: {' -> '.join(path + [point_id])}")
+        rule = checkpoints[point_id].sources.get(origin, {})
+        for dependency in rule.get("requires", []) + rule.get("unless", []):
+            check_cycle(dependency, origin, path + [point_id])
+
+    for node in checkpoints.values():
+        for origin in node.sources:
+            check_cycle(node.id, origin, [])
+    return topology, nodes
+
+
+class Runtime:
+    """Pokreće sve čvorove iz topologije u jednoj petlji događaja."""
+
+    def __init__(self, topology, nodes, api_url=None):
+        self.api_url = api_url or topology.get("api_url", "http://localhost:8000/readings")
+        self.tick_seconds = topology.get("tick_seconds", 10)
+        self.state_file = topology.get("state_file", "runtime_state.json")
+        self.entrances = [node for node in nodes if isinstance(node, EntranceNode)]
+        self.consumers = [node for node in nodes if not isinstance(node, EntranceNode)]
+        self.checkpoints = {node.id: node for node in nodes if isinstance(node, CheckpointNode)}
+
+        # Odmorišta trebaju i izlaze, kamere i izlazi samo ulaze
+        types = ["entrance"] + (["exit"] if any(isinstance(node, RestAreaNode) for node in nodes) else [])
+        self.feed = ReadingFeed(
+            types, topology.get("cursor_file", "feed_cursor_runtime.txt"), url=self.api_url + "/stream",
+        )
+        self.client = NodeClient(self.api_url, pool_size=HTTP_CONCURRENCY)
+        self.slots = asyncio.Semaphore(HTTP_CONCURRENCY)
+        # Obrađena očitanja pamte se samo dok iz njih još može nastati novo očitanje;
+        # starija se ionako preskaču, a nakon ponovnog pokretanja feed nastavlja od cursora
+        self.horizon = timedelta(minutes=longest_travel_minutes(nodes))
+        self.seen, self.pending = self._load_state()
+
+    def _load_state(self):
+        """Obrađena očitanja (ključ -> vrijeme očitanja u sekundama epohe) i ona čija
+        generirana očitanja server još nije prihvatio (ključ -> (vrijeme, očitanja))."""
+        if os.path.exists(self.state_file) and os.path.getsize(self.state_file) > 0:
+            try:
+                with open(self.state_file, "r") as f:
+                    state = json.load(f)
+                pending = {key: (seen_at, readings) for key, (seen_at, readings) in state.get("pending", {}).items()}
+                return dict(state["seen"]), pending
+            except (ValueError, KeyError, TypeError):
+                print(f"Upozorenje: {self.state_file} je oštećen. Kreće se ispočetka.")
+        return {}, {}
+
+    def _save_state(self, seen, pending):
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({"seen": seen, "pending": pending}, f)
+        os.replace(tmp_file, self.state_file)
+
+    @staticmethod
+    def _reading_id(node_id, item):
+        # Isto ulazno očitanje uvijek daje isti reading_id, pa server odbacuje ponovljeno slanje
+        return hashlib.blake2b(f"{node_id}|{reading_key(item)}".encode(), digest_size=16).hexdigest()
+
+    async def _send_batch(self, readings):
+        async with self.slots:
+            try:
+                response = await asyncio.to_thread(self.client.send_batch, readings)
+            except requests.exceptions.RequestException:
+                print("Ne mogu se spojiti na server. Provjeri FastAPI.")
+                return readings
+        if response.status_code != 200:
+            print(f"Greška: {response.status_code}, {response.text}")
+            return readings
+        # Djelomično odbijena serija (npr. ograničenje upisa za jednu kameru) stiže kao 200
+        return [readings[result["index"]] for result in response.json()["results"] if result["status"] == "error"]
+
+    async def send(self, readings):
+        """Šalje očitanja u serijama od BATCH_SIZE, usporedno; vraća ona koja server nije prihvatio."""
+        batches = [readings[i:i + BATCH_SIZE] for i in range(0, len(readings), BATCH_SIZE)]
+        return [reading for rejected in await asyncio.gather(*(self._send_batch(batch) for batch in batches))
+                for reading in rejected]
+
+    def scan_full_table(self):
+        # Server vraća očitanja neovisno o tome gdje su spremljena (STORAGE_BACKEND)
+        return fetch_all_readings(self.api_url)
+
+    async def tick(self):
+        items = await asyncio.to_thread(self.feed.fetch, self.scan_full_table)
+        routes = RouteTable(self.checkpoints)
+        cutoff = (datetime.now() - self.horizon).timestamp()
+        for item in items:
+            key = reading_key(item)
+            seen_at = parse_time(item.get("timestamp"))
+            if (key in self.seen or key in self.pending or not item.get("vehicle_id")
+                    or seen_at is None or seen_at.timestamp() < cutoff):
+                continue
+            readings = []
+            for node in self.consumers:
+                reading = node.process(item, routes)
+                if reading:
+                    reading["reading_id"] = self._reading_id(node.id, item)
+                    readings.append(reading)
+            self.pending[key] = (seen_at.timestamp(), readings)
+
+        # Neprihvaćena očitanja iz ranijih ciklusa šalju se ponovno (isti reading_id), dok ne zastare
+        self.pending = {key: entry for key, entry in self.pending.items() if entry[0] >= cutoff}
+        readings = [reading for _, generated in self.pending.values() for reading in generated]
+        rejected = await self.send(readings) if readings else []
+        rejected_ids = {reading["reading_id"] for reading in rejected}
+
+        # Očitanje je obrađeno tek kad server prihvati sva očitanja generirana iz njega
+        for key, (seen_at, generated) in list(self.pending.items()):
+            left = [reading for reading in generated if reading["reading_id"] in rejected_ids]
+            if left:
+                self.pending[key] = (seen_at, left)
+            else:
+                del self.pending[key]
+                self.seen[key] = seen_at
+
+        print(f"Pristiglo {len(items)} očitanja, poslano {len(readings)}, prihvaćeno {len(readings) - len(rejected)}"
+              f", za ponovno slanje {len(rejected)}.")
+        self.seen = {key: seen_at for key, seen_at in self.seen.items() if seen_at >= cutoff}
+        # Zapis na disk ne smije zaustaviti ulaze koji rade u istoj petlji
+        await asyncio.to_thread(self._save_state, dict(self.seen), dict(self.pending))
+        self.feed.commit()
+
+    async def run(self):
+        print(f"Pokrećem {len(self.entrances)} ulaza i {len(self.consumers)} ostalih čvorova...")
+        self.feed.start()
+        tasks = [asyncio.create_task(node.run(self)) for node in self.entrances]
+        try:
+            while True:
+                await self.tick()
+                await asyncio.sleep(self.tick_seconds)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("topology", nargs="?", default="topology.json")
+    parser.add_argument("--api-url", help="umjesto api_url iz topologije")
+    args = parser.parse_args()
+
+    topology, nodes = load_topology(args.topology)
+    try:
+        asyncio.run(Runtime(topology, nodes, args.api_url).run())
+    except KeyboardInterrupt:
+        print("Zaustavljeno.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import async_db
+
+
+def parse_overrides(value):
+    """Iz oblika "CAMERA1=10:20,PULA-ENTRANCE=2:5" u {camera_id: (rate, burst)}."""
+    overrides = {}
+    for entry in filter(None, (part.strip() for part in (value or "").split(","))):
+        camera_id, limits = entry.rsplit("=", 1)
+        rate, _, burst = limits.partition(":")
+        overrides[camera_id.strip()] = (float(rate), float(burst or rate))
+    return overrides
+
+
+class TokenBuckets:
+    """Token bucket po ključu (camera_id): `rate` očitanja u sekundi, najviše `burst` odjednom.
+
+    Zahtjev s više očitanja od `burst` prolazi samo kad je spremnik pun, a
+    spremnik tada ide u minus, pa se ograničenje ne može zaobići velikim
+    serijama. Pamti se najviše `max_keys` ključeva; izbačeni ključ ponovno
+    kreće s punim spremnikom. `rate` 0 isključuje ograničenje.
+    """
+
+    def __init__(self, rate, burst, overrides=None, max_keys=10000):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()
+
+    def take(self, key, count=1) -> float:
+        """0 ako je `count` tokena uzeto, inače sekunde do trenutka kad će ih biti dovoljno."""
+        rate, burst = self.overrides.get(key, (self.rate, self.burst))
+        if rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated_at = self.buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            needed = min(count, burst)
+            if tokens >= needed:
+                tokens -= count
+                wait = 0.0
+            else:
+                wait = (needed - tokens) / rate
+            self.buckets[key] = (tokens, now)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return wait
+
+
+class ConcurrencyLimit:
+    """Najviše `limit` istodobnih zahtjeva; višak se odmah odbija umjesto da čeka u redu."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self.lock:
+            if self.limit and self.active >= self.limit:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.active -= 1
+
+
+def retry_after(seconds):
+    """Vrijednost zaglavlja Retry-After (cijele sekunde, barem 1)."""
+    return str(max(1, math.ceil(seconds)))
+
+
+def create_rate_limiter():
+    return TokenBuckets(
+        rate=float(os.getenv("INGEST_RATE", "50")),
+        burst=float(os.getenv("INGEST_BURST", "100")),
+        overrides=parse_overrides(os.getenv("INGEST_RATE_OVERRIDES")),
+        max_keys=int(os.getenv("INGEST_RATE_MAX_CAMERAS", "10000")),
+    )
+
+
+def create_concurrency_limit():
+    # Zadano nekoliko puta više od dretvi za upis: dovoljno za punu propusnost,
+    # a zahtjevi preko toga bi samo čekali u redu dok DynamoDB ne počne odbijati
+    return ConcurrencyLimit(int(os.getenv("INGEST_MAX_CONCURRENCY", str(4 * async_db.WRITE_CONCURRENCY))))
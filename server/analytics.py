@@ -0,0 +1,218 @@
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from archive import CAMERA, ENTRANCE, EXIT, RESTAREA, FLAG_FIELDS
+from section_speed import DEFAULT_SPEED_LIMIT
+from timeutil import format_timestamp, parse_timestamp
+
+EPOCH = datetime(1970, 1, 1)
+
+BUCKETS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Redoslijed kao u feed.READING_TYPES: prvi postavljeni flag određuje tip
+TYPES = [("entrance", ENTRANCE), ("exit", EXIT), ("camera", CAMERA), ("restarea", RESTAREA)]
+
+# flags (0-255) -> indeks tipa u TYPES; len(TYPES) za očitanja bez tipa
+TYPE_OF_FLAGS = np.array(
+    [next((code for code, (_, flag) in enumerate(TYPES) if flags & flag), len(TYPES)) for flags in range(256)],
+    dtype=np.int64,
+)
+
+
+def wall_seconds(timestamp):
+    """Sekunde od 1970-01-01 po lokalnom satu iz očitanja, bez vremenske zone.
+
+    Granice sata i dana tada padaju na ponoć i puni sat po lokalnom
+    vremenu, i kad je između njih prijelaz na ljetno računanje vremena.
+    """
+    return int((parse_timestamp(timestamp) - EPOCH).total_seconds())
+
+
+def epoch_to_wall(epoch):
+    """Vektorizirano: epoha (kao u arhivi) -> lokalne sekunde kao u `wall_seconds`."""
+    if not len(epoch):
+        return epoch.astype(np.int64)
+    hours, inverse = np.unique(epoch // 3600, return_inverse=True)
+    # Pomak zone je isti unutar punog sata, pa se računa jednom po satu
+    offsets = np.array(
+        [(datetime.fromtimestamp(h * 3600) - EPOCH).total_seconds() - h * 3600 for h in hours.tolist()],
+        dtype=np.int64,
+    )
+    return epoch + offsets[inverse]
+
+
+class TrafficColumns:
+    """Sva očitanja u NumPy stupcima za agregacije po vremenskim intervalima.
+
+    Oznake kamera se pretvaraju u cijele brojeve (`points`), vrijeme u
+    lokalne sekunde, a brzine u int32 (-1 kad nije zadana). Novi upisi se
+    dodaju na kraj stupaca koji rastu udvostručavanjem, pa je upit samo
+    nekoliko vektoriziranih prolaza bez petlji po očitanjima.
+    """
+
+    def __init__(self, capacity=1 << 16):
+        self.lock = threading.Lock()
+        self.capacity = capacity
+        self.reset()
+
+    def reset(self):
+        self.points = []
+        self.point_index = {}
+        self.size = 0
+        self.time = np.empty(self.capacity, dtype=np.int64)
+        self.point = np.empty(self.capacity, dtype=np.int32)
+        self.flags = np.empty(self.capacity, dtype=np.uint8)
+        self.speed = np.empty(self.capacity, dtype=np.int32)
+        self.speed_limit = np.empty(self.capacity, dtype=np.int32)
+
+    def _intern(self, camera_id):
+        code = self.point_index.get(camera_id)
+        if code is None:
+            code = self.point_index[camera_id] = len(self.points)
+            self.points.append(camera_id)
+        return code
+
+    def _reserve(self, count):
+        needed = self.size + count
+        if needed <= len(self.time):
+            return
+        capacity = max(needed, 2 * len(self.time))
+        for name in ("time", "point", "flags", "speed", "speed_limit"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def _extend(self, time, point, flags, speed, speed_limit):
+        count = len(time)
+        self._reserve(count)
+        end = self.size + count
+        self.time[self.size:end] = time
+        self.point[self.size:end] = point
+        self.flags[self.size:end] = flags
+        self.speed[self.size:end] = speed
+        self.speed_limit[self.size:end] = speed_limit
+        self.size = end
+
+    def append(self, items):
+        rows = []
+        for item in items:
+            try:
+                seconds = wall_seconds(item.get("timestamp") or "")
+            except ValueError:
+                continue
+            rows.append((
+                seconds,
+                item.get("camera_id"),
+                sum(flag for field, flag in FLAG_FIELDS.items() if str(item.get(field)).lower() == "true"),
+                int(item["speed"]) if item.get("speed") is not None else -1,
+                int(item["speed_limit"]) if item.get("speed_limit") is not None else -1,
+            ))
+        if not rows:
+            return
+        with self.lock:
+            time, camera_ids, flags, speed, speed_limit = zip(*rows)
+            self._extend(time, [self._intern(camera_id) for camera_id in camera_ids], flags, speed, speed_limit)
+
+    def load_archive(self, archive):
+        data, camera_ids = archive.columns(columns=("time", "camera", "flags", "speed", "speed_limit"))
+        if not len(data["time"]):
+            return
+        with self.lock:
+            lookup = np.array([self._intern(camera_id) for camera_id in camera_ids], dtype=np.int32)
+            self._extend(
+                epoch_to_wall(data["time"]), lookup[data["camera"]], data["flags"], data["speed"], data["speed_limit"],
+            )
+
+    def rebuild(self, archive, items, chunk_size=10000):
+        with self.lock:
+            self.reset()
+        self.load_archive(archive)
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                self.append(chunk)
+                chunk = []
+        self.append(chunk)
+
+    def traffic(self, bucket="hour", start=None, end=None, camera_ids=None) -> dict:
+        """Broj očitanja, prosječna brzina i udio prekoračenja po tipu, točki i intervalu."""
+        size = BUCKETS[bucket]
+        with self.lock:
+            # Stupci se samo dodaju, pa je pogled do trenutne veličine stabilan i bez kopiranja
+            count = self.size
+            time = self.time[:count]
+            point = self.point[:count]
+            flags = self.flags[:count]
+            speed = self.speed[:count]
+            speed_limit = self.speed_limit[:count]
+            points = list(self.points)
+
+        mask = None
+        if start:
+            mask = time >= wall_seconds(start)
+        if end:
+            mask = (time <= wall_seconds(end)) if mask is None else mask & (time <= wall_seconds(end))
+        if camera_ids:
+            wanted = np.isin(point, [points.index(camera_id) for camera_id in camera_ids if camera_id in points])
+            mask = wanted if mask is None else mask & wanted
+        if mask is not None:
+            time, point, flags = time[mask], point[mask], flags[mask]
+            speed, speed_limit = speed[mask], speed_limit[mask]
+
+        type_code = TYPE_OF_FLAGS[flags]
+
+        # Grupa = (tip, točka, interval) kao jedan int64 ključ
+        buckets = time // size
+        first_bucket = int(buckets.min()) if len(buckets) else 0
+        bucket_count = int(buckets.max()) - first_bucket + 1 if len(buckets) else 1
+        point_count = max(len(points), 1)
+        keys = (type_code * point_count + point) * bucket_count + (buckets - first_bucket)
+        key_space = (len(TYPES) + 1) * point_count * bucket_count
+        if key_space <= max(4 * len(keys), 1 << 20):
+            # Gusti prostor ključeva: brojanje bez sortiranja
+            counts = np.bincount(keys, minlength=key_space)
+            groups = np.flatnonzero(counts)
+            volume = counts[groups]
+            lookup = np.zeros(key_space, dtype=np.int64)
+            lookup[groups] = np.arange(len(groups))
+            inverse = lookup[keys]
+        else:
+            groups, inverse, volume = np.unique(keys, return_inverse=True, return_counts=True)
+
+        has_speed = speed >= 0
+        limits = np.where(speed_limit >= 0, speed_limit, DEFAULT_SPEED_LIMIT)
+        speed_count = np.bincount(inverse[has_speed], minlength=len(groups))
+        speed_sum = np.bincount(inverse[has_speed], weights=speed[has_speed], minlength=len(groups))
+        speeding = np.bincount(inverse[has_speed & (speed > limits)], minlength=len(groups))
+
+        group_bucket = (groups % bucket_count).tolist()
+        group_point = (groups // bucket_count % point_count).tolist()
+        group_type = (groups // bucket_count // point_count).tolist()
+        avg_speed = np.round(speed_sum / np.maximum(speed_count, 1), 1).tolist()
+        speeding_ratio = np.round(speeding / np.maximum(speed_count, 1), 4).tolist()
+        speed_count = speed_count.tolist()
+        volume = volume.tolist()
+
+        # Oznake intervala se formatiraju jednom po intervalu, ne po grupi
+        labels = {}
+        for bucket_index in set(group_bucket):
+            labels[bucket_index] = format_timestamp(EPOCH + timedelta(seconds=(bucket_index + first_bucket) * size))
+
+        # Grupe su poredane po ključu, pa su intervali svake točke već poredani po vremenu
+        result = {}
+        for index in range(len(group_bucket)):
+            type_name = TYPES[group_type[index]][0] if group_type[index] < len(TYPES) else "other"
+            row = {
+                "bucket": labels[group_bucket[index]],
+                "volume": volume[index],
+            }
+            if speed_count[index]:
+                row["avg_speed"] = avg_speed[index]
+                row["speeding_ratio"] = speeding_ratio[index]
+            result.setdefault(type_name, {}).setdefault(points[group_point[index]], []).append(row)
+
+        return {"bucket": bucket, "from": start, "to": end, "count": int(len(time)), "data": result}
@@ -0,0 +1,271 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from stats import ENTRANCES
+from timeutil import format_seconds, format_timestamp, parse_timestamp, to_seconds
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "cold_archive")
+ARCHIVE_RETENTION_DAYS = int(os.getenv("ARCHIVE_RETENTION_DAYS", "30"))
+
+# Zastavice očitanja u stupcu "flags"
+ENTRANCE, EXIT, CAMERA, RESTAREA = 1, 2, 4, 8
+FLAG_FIELDS = {"is_entrance": ENTRANCE, "is_exit": EXIT, "is_camera": CAMERA, "is_restarea": RESTAREA}
+
+# Stupci s cijelim brojevima; -1 znači da vrijednost nije zadana
+INT_FIELDS = {"speed": "speed", "speed_limit": "speed_limit"}
+TIME_FIELDS = {"timestamp_entrance": "time_entrance", "timestamp_exit": "time_exit"}
+
+COLUMNS = ["time", "camera", "vehicle", "flags", "speed", "speed_limit", "time_entrance", "time_exit"]
+
+
+def to_epoch(timestamp):
+    if not timestamp:
+        return -1
+    return int(to_seconds(timestamp))
+
+
+def from_epoch(seconds):
+    return format_seconds(int(seconds))
+
+
+def write_part(directory, items):
+    """Zapisuje očitanja jednog dana kao novi dio particije (jedna .npy datoteka po stupcu).
+
+    Dio se piše u privremeni direktorij i tek se onda preimenuje, pa čitač
+    nikad ne vidi napola zapisan dio. Retci su poredani po vremenu.
+    """
+    items = sorted(items, key=lambda item: item["timestamp"])
+    cameras = sorted({(item["camera_id"], item.get("camera_location") or "") for item in items})
+    camera_codes = {camera: code for code, camera in enumerate(cameras)}
+    vehicles = [item["vehicle_id"].encode() for item in items]
+
+    columns = {
+        "time": np.array([to_epoch(item["timestamp"]) for item in items], dtype=np.int64),
+        "camera": np.array(
+            [camera_codes[(item["camera_id"], item.get("camera_location") or "")] for item in items],
+            dtype=np.int32,
+        ),
+        "vehicle": np.array(vehicles, dtype=f"S{max(len(v) for v in vehicles)}"),
+        "flags": np.array(
+            [sum(flag for field, flag in FLAG_FIELDS.items() if item.get(field)) for item in items],
+            dtype=np.uint8,
+        ),
+    }
+    for field, column in INT_FIELDS.items():
+        columns[column] = np.array(
+            [item[field] if item.get(field) is not None else -1 for item in items], dtype=np.int32,
+        )
+    for field, column in TIME_FIELDS.items():
+        columns[column] = np.array([to_epoch(item.get(field)) for item in items], dtype=np.int64)
+
+    name = f"part-{time.time_ns()}-{os.getpid()}"
+    tmp_path = os.path.join(directory, "." + name)
+    os.makedirs(tmp_path)
+    for column, values in columns.items():
+        np.save(os.path.join(tmp_path, column + ".npy"), values)
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump({"count": len(items), "cameras": [list(camera) for camera in cameras]}, f, ensure_ascii=False)
+    os.rename(tmp_path, os.path.join(directory, name))
+
+
+class ColdArchive:
+    """Očitanja starija od roka zadržavanja, u stupcima po danima.
+
+    Struktura: <ARCHIVE_DIR>/<YYYY-MM-DD>/part-*/<stupac>.npy + meta.json.
+    Datoteke se otvaraju kao memory-map, pa upit čita s diska samo retke
+    iz traženog vremenskog raspona.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+
+    def append(self, items):
+        by_day = {}
+        for item in items:
+            by_day.setdefault(item["timestamp"][:10], []).append(item)
+        for day, day_items in by_day.items():
+            day_path = os.path.join(self.directory, day)
+            os.makedirs(day_path, exist_ok=True)
+            write_part(day_path, day_items)
+
+    def parts(self, start=None, end=None):
+        if not os.path.isdir(self.directory):
+            return []
+        parts = []
+        for day in sorted(os.listdir(self.directory)):
+            if (start and day < start[:10]) or (end and day > end[:10]):
+                continue
+            day_path = os.path.join(self.directory, day)
+            parts.extend(
+                os.path.join(day_path, name) for name in sorted(os.listdir(day_path)) if name.startswith("part-")
+            )
+        return parts
+
+    @staticmethod
+    def _load_part(path, start_epoch=None, end_epoch=None, columns=COLUMNS):
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        times = np.load(os.path.join(path, "time.npy"), mmap_mode="r")
+        low = np.searchsorted(times, start_epoch, side="left") if start_epoch is not None else 0
+        high = np.searchsorted(times, end_epoch, side="right") if end_epoch is not None else len(times)
+        data = {column: np.load(os.path.join(path, column + ".npy"), mmap_mode="r")[low:high] for column in columns}
+        return meta, data
+
+    def columns(self, start=None, end=None, columns=("time", "camera", "vehicle", "flags")):
+        """Stupci svih dijelova u rasponu [start, end], spojeni; kamere kao popis camera_id."""
+        start_epoch = to_epoch(start) if start else None
+        end_epoch = to_epoch(end) if end else None
+
+        camera_index = {}
+        chunks = {column: [] for column in columns}
+        for path in self.parts(start, end):
+            meta, data = self._load_part(path, start_epoch, end_epoch, columns)
+            if "camera" in data:
+                # Šifre kamera su lokalne za dio, pa se preslikavaju u zajedničke
+                lookup = np.array(
+                    [camera_index.setdefault(camera_id, len(camera_index)) for camera_id, _ in meta["cameras"]],
+                    dtype=np.int32,
+                )
+                data["camera"] = lookup[data["camera"]] if len(lookup) else data["camera"]
+            for column in columns:
+                chunks[column].append(data[column])
+        camera_ids = list(camera_index)
+
+        merged = {
+            column: np.concatenate(values) if values else np.empty(0, dtype=np.int64)
+            for column, values in chunks.items()
+        }
+        return merged, camera_ids
+
+    def iter_items(self):
+        """Sva arhivirana očitanja kao rječnici (za ponovnu izgradnju statistike)."""
+        for path in self.parts():
+            meta, data = self._load_part(path)
+            cameras = meta["cameras"]
+            rows = zip(*(data[column].tolist() for column in COLUMNS))
+            for seconds, camera, vehicle, flags, speed, speed_limit, time_entrance, time_exit in rows:
+                camera_id, camera_location = cameras[camera]
+                item = {
+                    "camera_id": camera_id,
+                    "camera_location": camera_location,
+                    "vehicle_id": vehicle.decode(),
+                    "timestamp": from_epoch(seconds),
+                    "speed": speed if speed != -1 else None,
+                    "speed_limit": speed_limit if speed_limit != -1 else None,
+                    "timestamp_entrance": from_epoch(time_entrance) if time_entrance != -1 else None,
+                    "timestamp_exit": from_epoch(time_exit) if time_exit != -1 else None,
+                }
+                for field, flag in FLAG_FIELDS.items():
+                    item[field] = True if flags & flag else None
+                yield item
+
+    def statistics(self, start=None, end=None) -> dict:
+        """Isti oblik kao /stats, ali samo za arhivirana očitanja u rasponu [start, end]."""
+        data, camera_ids = self.columns(start, end)
+        result = {
+            entrance: {"total_entrances": 0, "passed_cameras": {}, "exited": {}}
+            for entrance in ENTRANCES
+        }
+        if not len(data["time"]):
+            return {"count": 0, "statistics": result}
+
+        _, vehicles = np.unique(data["vehicle"], return_inverse=True)
+        cameras = data["camera"].astype(np.int64)
+        flags = data["flags"]
+        is_entrance = (flags & ENTRANCE) != 0
+        is_camera = (flags & CAMERA) != 0
+        is_exit = ~is_entrance & ~is_camera
+
+        # Jedinstveni parovi (vozilo, točka) kao jedan int64 ključ
+        camera_count = len(camera_ids)
+
+        def pairs(mask):
+            keys = np.unique(vehicles[mask] * camera_count + cameras[mask])
+            return keys // camera_count, keys % camera_count
+
+        camera_vehicles, camera_points = pairs(is_camera)
+        exit_vehicles, exit_points = pairs(is_exit)
+        entrance_vehicles, entrance_points = pairs(is_entrance)
+
+        seen_cameras = np.unique(camera_points)
+        seen_exits = np.unique(exit_points)
+        for entrance in ENTRANCES:
+            if entrance not in camera_ids:
+                result[entrance]["passed_cameras"] = {camera_ids[c]: 0 for c in seen_cameras}
+                result[entrance]["exited"] = {camera_ids[c]: 0 for c in seen_exits}
+                continue
+            entered = entrance_vehicles[entrance_points == camera_ids.index(entrance)]
+            passed = np.bincount(camera_points[np.isin(camera_vehicles, entered)], minlength=camera_count)
+            exited = np.bincount(exit_points[np.isin(exit_vehicles, entered)], minlength=camera_count)
+            result[entrance] = {
+                "total_entrances": int(len(entered)),
+                "passed_cameras": {camera_ids[c]: int(passed[c]) for c in seen_cameras},
+                "exited": {camera_ids[c]: int(exited[c]) for c in seen_exits},
+            }
+        return {"count": int(len(data["time"])), "statistics": result}
+
+
+def archive_older_than(storage, archive, cutoff, batch_size=10000, dry_run=False):
+    """Premješta očitanja starija od `cutoff` iz spremišta u arhivu.
+
+    Svaka serija se prvo zapiše u arhivu pa tek onda briše iz spremišta.
+    Ako se postupak prekine između ta dva koraka, ista očitanja će se pri
+    sljedećem pokretanju arhivirati još jednom; statistika broji jedinstvena
+    vozila, pa duplikati ne mijenjaju rezultat.
+    """
+    scanned = 0
+    moved = 0
+    batch = []
+    # Sva spremišta podnose brisanje tijekom skeniranja (cursor ne ovisi o obrisanim zapisima)
+    for item in storage.scan_all():
+        scanned += 1
+        timestamp = item.get("timestamp") or ""
+        try:
+            parse_timestamp(timestamp)
+        except ValueError:
+            # Očitanja s nepoznatim formatom vremena ostaju u tablici
+            continue
+        if timestamp < cutoff:
+            batch.append(item)
+        if len(batch) >= batch_size:
+            moved += _move(storage, archive, batch, dry_run)
+            batch = []
+            print(f"Pregledano {scanned} očitanja, arhivirano {moved}...")
+
+    if batch:
+        moved += _move(storage, archive, batch, dry_run)
+    return scanned, moved
+
+
+def _move(storage, archive, items, dry_run):
+    if not dry_run:
+        archive.append(items)
+        storage.delete_batch(items)
+    return len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arhiviranje starih očitanja u stupčane datoteke")
+    parser.add_argument("--retention-days", type=int, default=ARCHIVE_RETENTION_DAYS,
+                        help="koliko dana očitanja ostaje u tablici")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--dry-run", action="store_true", help="samo prebroji očitanja koja bi se arhivirala")
+    args = parser.parse_args()
+
+    from storage import create_storage
+
+    cutoff = format_timestamp(datetime.now() - timedelta(days=args.retention_days))
+    storage = create_storage()
+    scanned, moved = archive_older_than(storage, ColdArchive(args.archive_dir), cutoff, args.batch_size, args.dry_run)
+    storage.close()
+    print(f"Gotovo: pregledano {scanned}, {'za arhivirati' if args.dry_run else 'arhivirano'} {moved} (starije od {cutoff}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Odvojeni bazeni dretvi i ograničenja za čitanja i upise, tako da dugo
+# skeniranje (npr. /readings ili /stats?rebuild) ne može zauzeti sve dretve
+# i blokirati upis novih očitanja.
+READ_WORKERS = int(os.getenv("DB_READ_WORKERS", "8"))
+WRITE_WORKERS = int(os.getenv("DB_WRITE_WORKERS", "16"))
+READ_CONCURRENCY = int(os.getenv("DB_READ_CONCURRENCY", str(READ_WORKERS)))
+WRITE_CONCURRENCY = int(os.getenv("DB_WRITE_CONCURRENCY", str(WRITE_WORKERS)))
+
+read_executor = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="dynamodb-read")
+write_executor = ThreadPoolExecutor(max_workers=WRITE_WORKERS, thread_name_prefix="dynamodb-write")
+
+read_limit = asyncio.Semaphore(READ_CONCURRENCY)
+write_limit = asyncio.Semaphore(WRITE_CONCURRENCY)
+
+
+async def _run(executor, limit, fn, *args, **kwargs):
+    async with limit:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_read(fn, *args, **kwargs):
+    return await _run(read_executor, read_limit, fn, *args, **kwargs)
+
+
+async def run_write(fn, *args, **kwargs):
+    return await _run(write_executor, write_limit, fn, *args, **kwargs)
+
+
+def shutdown():
+    read_executor.shutdown(wait=True)
+    write_executor.shutdown(wait=True)
@@ -1,15 +1,24 @@
-import boto3
+import time
 
-dynamodb_client = boto3.resource(
-    "dynamodb",
-    endpoint_url="http://localstack:4566",
-    region_name="us-east-1",
-    aws_access_key_id="test",
-    aws_secret_access_key="test"
-)
+from dynamo import get_resource
+
+dynamodb_client = get_resource()
 
 table_name = "Readings"
 
+# Sekundarni indeks po vozilu, da provjera ponovnog ulaza ne mora skenirati cijelu tablicu
+vehicle_index_name = "VehicleIndex"
+
+vehicle_index = {
+    "IndexName": vehicle_index_name,
+    "KeySchema": [
+        {"AttributeName": "vehicle_id", "KeyType": "HASH"},
+        {"AttributeName": "timestamp", "KeyType": "RANGE"}
+    ],
+    "Projection": {"ProjectionType": "ALL"},
+    "ProvisionedThroughput": {"ReadCapacityUnits": 5, "WriteCapacityUnits": 5},
+}
+
 existing_tables = dynamodb_client.meta.client.list_tables()["TableNames"]
 
 if table_name not in existing_tables:
@@ -22,8 +31,10 @@ if table_name not in existing_tables:
         ],
         AttributeDefinitions=[
             {"AttributeName": "camera_id", "AttributeType": "S"},
-            {"AttributeName": "timestamp", "AttributeType": "S"}
+            {"AttributeName": "timestamp", "AttributeType": "S"},
+            {"AttributeName": "vehicle_id", "AttributeType": "S"}
         ],
+        GlobalSecondaryIndexes=[vehicle_index],
         ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5},
     )
 
@@ -31,3 +42,48 @@ if table_name not in existing_tables:
     print(f"Table '{table_name}' created successfully!")
 else:
     print(f"Table '{table_name}' already exists")
+
+    # Starije tablice nemaju indeks po vozilu pa ga dodajemo naknadno
+    description = dynamodb_client.meta.client.describe_table(TableName=table_name)["Table"]
+    indexes = [index["IndexName"] for index in description.get("GlobalSecondaryIndexes", [])]
+
+    if vehicle_index_name not in indexes:
+        print(f"Adding index '{vehicle_index_name}' to table '{table_name}'...")
+        dynamodb_client.meta.client.update_table(
+            TableName=table_name,
+            AttributeDefinitions=[
+                {"AttributeName": "vehicle_id", "AttributeType": "S"},
+                {"AttributeName": "timestamp", "AttributeType": "S"}
+            ],
+            GlobalSecondaryIndexUpdates=[{"Create": vehicle_index}],
+        )
+
+    # Upiti nad indeksom koji se još puni ne prolaze, pa se čeka da postane aktivan
+    while True:
+        description = dynamodb_client.meta.client.describe_table(TableName=table_name)["Table"]
+        statuses = {index["IndexName"]: index.get("IndexStatus") for index in description.get("GlobalSecondaryIndexes", [])}
+        status = statuses.get(vehicle_index_name)
+        if status == "ACTIVE":
+            break
+        print(f"Index '{vehicle_index_name}' is {status or 'CREATING'}, waiting...")
+        time.sleep(5)
+
+# Oznake upisanih reading_id: upisuju se u istoj transakciji s očitanjem, samo ako još ne postoje
+reading_ids_table_name = "ReadingIds"
+
+if reading_ids_table_name not in existing_tables:
+    print(f"Creating DynamoDB table '{reading_ids_table_name}'...")
+    table = dynamodb_client.create_table(
+        TableName=reading_ids_table_name,
+        KeySchema=[{"AttributeName": "reading_id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "reading_id", "AttributeType": "S"}],
+        ProvisionedThroughput={"ReadCapacityUnits": 5, "WriteCapacityUnits": 5},
+    )
+    table.meta.client.get_waiter('table_exists').wait(TableName=reading_ids_table_name)
+
+    # Oznake istječu (expires_at), pa tablica ne raste bez granice
+    dynamodb_client.meta.client.update_time_to_live(
+        TableName=reading_ids_table_name,
+        TimeToLiveSpecification={"Enabled": True, "AttributeName": "expires_at"},
+    )
+    print(f"Table '{reading_ids_table_name}' created successfully!")
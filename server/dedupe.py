@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from operator import itemgetter
+
+from timeutil import expire_before
+
+PENDING = "pending"
+DONE = "done"
+
+
+class DedupeCache:
+    """Nedavno primljeni reading_id, da ponovljeni zahtjevi ne dođu do baze.
+
+    Ključ se zauzima (`claim`) prije upisa i označava upisanim (`complete`)
+    nakon njega; ako upis ne uspije, oslobađa se (`release`) pa ga klijent
+    može poslati ponovno. Zapisi istječu nakon `ttl` sekundi, a kad ih je
+    više od `max_size`, izbacuju se najstariji. Za ključeve koji su ispali
+    iz međuspremnika duplikat prepoznaje uvjetni upis u spremištu.
+
+    Upis koji nije uspio (npr. istek veze) možda je ipak zapisan u spremištu,
+    a nije primijenjen na statistiku. Takvi ključevi se pamte (`unapplied`),
+    pa se duplikat iz spremišta s tim ključem primjenjuje (`take_unapplied`).
+    """
+
+    def __init__(self, max_size=100000, ttl=600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.unapplied = OrderedDict()
+
+    def claim(self, reading_id):
+        """None ako je ključ nov (i sada zauzet), inače PENDING ili DONE."""
+        now = time.monotonic()
+        with self.lock:
+            # Zapisi su poredani po vremenu zauzimanja
+            expire_before(self.entries, now - self.ttl, itemgetter(1))
+            entry = self.entries.get(reading_id)
+            if entry is not None:
+                return entry[0]
+            self.entries[reading_id] = (PENDING, now)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            return None
+
+    def complete(self, reading_ids):
+        with self.lock:
+            for reading_id in reading_ids:
+                self.unapplied.pop(reading_id, None)
+                entry = self.entries.get(reading_id)
+                if entry is not None:
+                    self.entries[reading_id] = (DONE, entry[1])
+
+    def release(self, reading_ids, maybe_written=False):
+        with self.lock:
+            for reading_id in reading_ids:
+                entry = self.entries.get(reading_id)
+                if entry is not None and entry[0] == PENDING:
+                    del self.entries[reading_id]
+                    if maybe_written:
+                        self.unapplied[reading_id] = True
+            while len(self.unapplied) > self.max_size:
+                self.unapplied.popitem(last=False)
+
+    def take_unapplied(self, reading_ids):
+        """reading_id (od zadanih) čiji raniji upis možda jest zapisan, a nije primijenjen; brišu se."""
+        with self.lock:
+            return {reading_id for reading_id in reading_ids if self.unapplied.pop(reading_id, None)}
@@ -0,0 +1,48 @@
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+from metrics import InstrumentedTable
+
+# Zajednička konfiguracija DynamoDB klijenta za server i čvorove.
+# Prazna vrijednost DYNAMODB_ENDPOINT znači pravi AWS endpoint.
+ENDPOINT_URL = os.getenv("DYNAMODB_ENDPOINT", "http://localstack:4566") or None
+REGION = os.getenv("AWS_REGION", "us-east-1")
+
+client_config = Config(
+    max_pool_connections=int(os.getenv("DYNAMODB_MAX_POOL_CONNECTIONS", "50")),
+    connect_timeout=float(os.getenv("DYNAMODB_CONNECT_TIMEOUT", "2")),
+    read_timeout=float(os.getenv("DYNAMODB_READ_TIMEOUT", "10")),
+    retries={"max_attempts": int(os.getenv("DYNAMODB_MAX_ATTEMPTS", "5")), "mode": "adaptive"},
+    tcp_keepalive=True,
+)
+
+_lock = threading.Lock()
+_resources = {}
+_tables = {}
+
+
+def get_resource(endpoint_url=None):
+    endpoint_url = endpoint_url or ENDPOINT_URL
+    with _lock:
+        if endpoint_url not in _resources:
+            session = boto3.session.Session(
+                region_name=REGION,
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "test"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "test"),
+            )
+            _resources[endpoint_url] = session.resource(
+                "dynamodb", endpoint_url=endpoint_url, config=client_config
+            )
+        return _resources[endpoint_url]
+
+
+def get_table(table_name, endpoint_url=None):
+    resource = get_resource(endpoint_url)
+    key = (endpoint_url or ENDPOINT_URL, table_name)
+    with _lock:
+        if key not in _tables:
+            _tables[key] = InstrumentedTable(resource.Table(table_name))
+        return _tables[key]
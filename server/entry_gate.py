@@ -0,0 +1,132 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from feed import reading_type
+from timeutil import expire_before, reading_seconds
+
+
+class RotatingBloomFilter:
+    """Bloom filter s vremenskim prozorom, od `generations` filtara koji se izmjenjuju.
+
+    Novi ključevi idu u najnoviji filtar; svakih `window / (generations - 1)`
+    sekundi najstariji se briše i postaje najnoviji. Ključ dodan prije manje
+    od `window` sekundi uvijek je u nekom od filtara.
+    """
+
+    def __init__(self, window, capacity, error_rate=0.01, generations=3):
+        self.span = window / (generations - 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.filters = [bytearray((self.size + 7) // 8) for _ in range(generations)]
+        self.rotated_at = time.monotonic()
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def _rotate(self, now):
+        while now - self.rotated_at >= self.span:
+            self.filters.pop(0)
+            self.filters.append(bytearray(len(self.filters[0])))
+            self.rotated_at += self.span
+
+    def add(self, key, now):
+        self._rotate(now)
+        current = self.filters[-1]
+        for position in self._positions(key):
+            current[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        positions = self._positions(key)
+        return any(
+            all(bits[position >> 3] & (1 << (position & 7)) for position in positions)
+            for bits in self.filters
+        )
+
+
+class EntryGate:
+    """Pravilo ponovnog ulaza (jedan ulaz u `window` sekundi) pri svakom upisu ulaza.
+
+    Redoslijed provjere: Bloom filter (ako vozila sigurno nema, ulaz je
+    dopušten bez ikakvog upita), pa točan rječnik nedavnih ulaza. Tek ako
+    filtar kaže "možda", a vozila nema u rječniku (lažno pozitivan ili je
+    izbačeno zbog `max_vehicles`), odluku donosi upit nad spremištem.
+    """
+
+    def __init__(self, window=12 * 3600, capacity=100000, max_vehicles=200000):
+        self.window = window
+        self.max_vehicles = max_vehicles
+        self.lock = threading.Lock()
+        self.bloom = RotatingBloomFilter(window, capacity)
+        self.recent = OrderedDict()
+
+    def _expire(self, now):
+        # Rječnik je (uglavnom) poredan po vremenu ulaza, pa se briše s početka
+        expire_before(self.recent, now - self.window)
+
+    def _entered_recently(self, vehicle_id, now):
+        # Vrijeme se provjerava i ovdje, jer punjenje pri pokretanju ne ide redom
+        entered_at = self.recent.get(vehicle_id)
+        return entered_at is not None and entered_at >= now - self.window
+
+    def _record(self, vehicle_id, now, entered_at):
+        self.bloom.add(vehicle_id, now)
+        self.recent.pop(vehicle_id, None)
+        self.recent[vehicle_id] = entered_at
+        while len(self.recent) > self.max_vehicles:
+            self.recent.popitem(last=False)
+
+    def check(self, vehicle_id):
+        """True: smije ući; False: već je ušlo; None: treba provjeriti spremište."""
+        now = time.time()
+        with self.lock:
+            if vehicle_id not in self.bloom:
+                return True
+            self._expire(now)
+            if self._entered_recently(vehicle_id, now):
+                return False
+            return None
+
+    def admit(self, vehicle_id, entered_at) -> bool:
+        """Bilježi ulaz ako vozilo u međuvremenu nije primljeno drugim zahtjevom."""
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            if self._entered_recently(vehicle_id, now):
+                return False
+            # Ulaz stariji od prozora (naknadni upis) ne blokira sljedeći
+            if entered_at >= now - self.window:
+                self._record(vehicle_id, time.monotonic(), entered_at)
+            return True
+
+    def release(self, vehicle_id):
+        """Poništava `admit` kad upis nije uspio (Bloom filter ostaje, pa odlučuje spremište)."""
+        with self.lock:
+            self.recent.pop(vehicle_id, None)
+
+    def observe(self, item):
+        """Punjenje pri pokretanju iz postojećih očitanja."""
+        if reading_type(item) != "entrance":
+            return
+        entered_at = reading_seconds(item)
+        if entered_at is None or entered_at < time.time() - self.window:
+            return
+        with self.lock:
+            if entered_at >= self.recent.get(item["vehicle_id"], entered_at):
+                self._record(item["vehicle_id"], time.monotonic(), entered_at)
+
+
+def create_gate():
+    if os.getenv("ENTRY_GATE", "1").lower() not in ("1", "true"):
+        return None
+    return EntryGate(
+        window=int(os.getenv("REENTRY_HOURS", "12")) * 3600,
+        capacity=int(os.getenv("ENTRY_GATE_CAPACITY", "100000")),
+        max_vehicles=int(os.getenv("ENTRY_GATE_MAX_VEHICLES", "200000")),
+    )
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+from paging import to_json
+from stats import is_true
+
+READING_TYPES = ["entrance", "exit", "camera", "restarea"]
+
+
+def reading_type(item: dict):
+    for reading_type_name in READING_TYPES:
+        if is_true(item.get(f"is_{reading_type_name}")):
+            return reading_type_name
+    return None
+
+
+class ChangeFeed:
+    """Memorijski niz upisanih očitanja za pretplatnike (Server-Sent Events).
+
+    Svako očitanje dobiva redni broj; cursor je `<epoha>-<broj>`, gdje epoha
+    označava pokretanje servera. Klijent koji se ponovno spoji s cursorom
+    dobiva sve što je propustio, ako je to još u međuspremniku. Inače dobiva
+    događaj `gap` i treba jednom pročitati tablicu.
+    """
+
+    def __init__(self, max_events=10000, heartbeat=15):
+        self.epoch = format(int(time.time()), "x")
+        self.events = deque(maxlen=max_events)
+        self.seq = 0
+        self.heartbeat = heartbeat
+        self.lock = threading.Lock()
+        self.waiters = set()
+
+    def publish(self, items):
+        with self.lock:
+            for item in items:
+                self.seq += 1
+                self.events.append((self.seq, item))
+            waiters = list(self.waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def cursor(self, seq) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def parse_cursor(self, cursor):
+        """Vraća (seq, gap). Cursor iz prethodnog pokretanja servera znači gap."""
+        if not cursor:
+            return self.seq, False
+        epoch, _, seq = cursor.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return 0, True
+        return min(int(seq), self.seq), False
+
+    def read_since(self, seq):
+        with self.lock:
+            if not self.events:
+                return [], False
+            oldest = self.events[0][0]
+            gap = seq < oldest - 1
+            return list(islice(self.events, max(seq - oldest + 1, 0), None)), gap
+
+    async def subscribe(self, cursor=None, types=None):
+        seq, gap = self.parse_cursor(cursor)
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+        with self.lock:
+            self.waiters.add(waiter)
+
+        try:
+            while True:
+                event.clear()
+                events, missed = self.read_since(seq)
+                if gap or missed:
+                    yield "event: gap\ndata: {}\n\n"
+                    gap = False
+
+                for seq, item in events:
+                    if types and reading_type(item) not in types:
+                        continue
+                    yield f"id: {self.cursor(seq)}\ndata: {to_json(item)}\n\n"
+
+                if not events:
+                    try:
+                        await asyncio.wait_for(event.wait(), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        # Komentar održava vezu i javlja klijentu trenutni cursor
+                        yield f": {self.cursor(seq)}\n\n"
+        finally:
+            with self.lock:
+                self.waiters.discard(waiter)
@@ -0,0 +1,150 @@
+import threading
+from collections import OrderedDict
+
+from feed import reading_type
+
+from timeutil import parse_timestamp
+
+
+def _minutes_between(start, end):
+    try:
+        delta = parse_timestamp(end) - parse_timestamp(start)
+    except (TypeError, ValueError):
+        return None
+    return round(delta.total_seconds() / 60, 1)
+
+
+def journey_events(items):
+    events = []
+    for item in items:
+        event_type = reading_type(item) or "reading"
+        event = {"type": event_type, "camera_id": item.get("camera_id"), "timestamp": item.get("timestamp")}
+
+        if event_type == "restarea":
+            # Odmorište bilježi ulazak i izlazak u jednom očitanju
+            events.append(dict(event, type="restarea_entrance", timestamp=item.get("timestamp_entrance") or item.get("timestamp")))
+            events.append(dict(event, type="restarea_exit", timestamp=item.get("timestamp_exit") or item.get("timestamp")))
+            continue
+
+        if item.get("speed") is not None:
+            event["speed"] = item["speed"]
+            event["speed_limit"] = item.get("speed_limit")
+        events.append(event)
+
+    events.sort(key=lambda event: event["timestamp"] or "")
+    return events
+
+
+def _new_trip(event=None):
+    return {
+        "entrance": event["camera_id"] if event else None,
+        "exit": None,
+        "start": event["timestamp"] if event else None,
+        "end": None,
+        "complete": False,
+        "segments": [],
+        "rest_stops": [],
+        "last_point": event,
+    }
+
+
+def _close_trip(trip):
+    trip["complete"] = bool(trip["entrance"] and trip["exit"])
+    trip["duration_minutes"] = _minutes_between(trip["start"], trip["end"])
+    del trip["last_point"]
+    return trip
+
+
+def journey_trips(events):
+    """Dijeli događaje na putovanja (ulaz → ... → izlaz) i dionice između točaka."""
+    trips = []
+    trip = None
+
+    for event in events:
+        if event["type"] == "entrance":
+            if trip:
+                trips.append(_close_trip(trip))
+            trip = _new_trip(event)
+            continue
+
+        if trip is None:
+            trip = _new_trip()
+            trip["start"] = event["timestamp"]
+
+        if event["type"] == "restarea_entrance":
+            trip["rest_stops"].append({"camera_id": event["camera_id"], "from": event["timestamp"], "to": None})
+            continue
+        if event["type"] == "restarea_exit":
+            stop = trip["rest_stops"][-1] if trip["rest_stops"] else None
+            if stop and stop["to"] is None and stop["camera_id"] == event["camera_id"]:
+                stop["to"] = event["timestamp"]
+                stop["minutes"] = _minutes_between(stop["from"], stop["to"])
+            continue
+
+        previous = trip["last_point"]
+        if previous:
+            trip["segments"].append({
+                "from": previous["camera_id"],
+                "to": event["camera_id"],
+                "start": previous["timestamp"],
+                "end": event["timestamp"],
+                "minutes": _minutes_between(previous["timestamp"], event["timestamp"]),
+            })
+        trip["last_point"] = event
+        trip["end"] = event["timestamp"]
+
+        if event["type"] == "exit":
+            trip["exit"] = event["camera_id"]
+            trips.append(_close_trip(trip))
+            trip = None
+
+    if trip:
+        trips.append(_close_trip(trip))
+    return trips
+
+
+def build_journey(vehicle_id, items):
+    events = journey_events(items)
+    return {"vehicle_id": vehicle_id, "events": events, "trips": journey_trips(events)}
+
+
+class JourneyCache:
+    """LRU međuspremnik sastavljenih putovanja.
+
+    Novo očitanje vozila briše njegovo putovanje iz međuspremnika. Putovanje
+    koje se sastavljalo dok je stiglo novo očitanje ne sprema se, jer bi već
+    bilo zastarjelo.
+    """
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.journeys = OrderedDict()
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, vehicle_id):
+        with self.lock:
+            journey = self.journeys.get(vehicle_id)
+            if journey is None:
+                self.misses += 1
+                return None, self.pending.setdefault(vehicle_id, object())
+            self.hits += 1
+            self.journeys.move_to_end(vehicle_id)
+            return journey, None
+
+    def put(self, vehicle_id, journey, token):
+        with self.lock:
+            if self.pending.get(vehicle_id) is not token:
+                return
+            del self.pending[vehicle_id]
+            self.journeys[vehicle_id] = journey
+            self.journeys.move_to_end(vehicle_id)
+            while len(self.journeys) > self.max_size:
+                self.journeys.popitem(last=False)
+
+    def invalidate(self, vehicle_id):
+        with self.lock:
+            self.journeys.pop(vehicle_id, None)
+            self.pending.pop(vehicle_id, None)
@@ -1,112 +1,704 @@
-from fastapi import FastAPI
+import functools
+import itertools
+import os
+import time
+from typing import Optional
+from fastapi import FastAPI, Header, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from models import Reading
-from database import dynamodb_client
+from wire import openapi_body, parse_readings
+from storage import StorageError, create_storage
+from stats import StatsEngine
+from archive import ColdArchive
+from analytics import BUCKETS, TrafficColumns
+from feed import ChangeFeed, READING_TYPES, reading_type
+from entry_gate import create_gate
+from dedupe import DONE, DedupeCache
+from admission import create_concurrency_limit, create_rate_limiter, retry_after
+from section_speed import create_engine as create_section_speed_engine
+from od_matrix import create_engine as create_od_matrix
+from journey import JourneyCache, build_journey
+import metrics
+from response_cache import ResponseCache
+from write_behind import WriteBehindQueue
+import async_db
+from async_db import run_read, run_write
+from paging import decode_cursor, encode_cursor, ndjson_lines
+from timeutil import format_timestamp, now_timestamp, parse_timestamp, reading_seconds
+from collections import Counter
 from datetime import datetime, timedelta
-from boto3.dynamodb.conditions import Attr
 
 app = FastAPI()
 
-TABLE_NAME = "Readings"
+# DynamoDB (zadano), SQLite ili memorija, prema STORAGE_BACKEND
+storage = create_storage()
 
-def can_enter(vehicle_id: str, table, hours: int = 12) -> bool:
-    cutoff_time = datetime.now() - timedelta(hours=hours)
-    cutoff_str = cutoff_time.strftime("%Y-%m-%d %H:%M:%S")
+# Očitanja starija od roka zadržavanja (archive.py ih premješta iz spremišta)
+cold_archive = ColdArchive()
 
-    response = table.scan(
-        FilterExpression=Attr("vehicle_id").eq(vehicle_id)
-        & Attr("is_entrance").eq(True)
-        & Attr("timestamp").gte(cutoff_str)
+# Očitanja u NumPy stupcima za /analytics/traffic
+traffic = TrafficColumns()
+
+# Statistika se drži u memoriji; snimka na disk je opcionalna
+stats_engine = StatsEngine(snapshot_file=os.getenv("STATS_SNAPSHOT_FILE"))
+
+# Novi upisi za pretplatnike na /readings/stream
+change_feed = ChangeFeed(max_events=int(os.getenv("FEED_BUFFER_SIZE", "10000")))
+
+# Prosječna brzina na dionicama između ulaza, kamera i izlaza
+section_speed = create_section_speed_engine()
+
+# Parovi ulaz → izlaz, ukupno i po minutama za zadnjih OD_WINDOW sekundi
+od_matrix = create_od_matrix()
+
+# Pravilo ponovnog ulaza pri upisu (ENTRY_GATE=0 ga isključuje)
+REENTRY_HOURS = int(os.getenv("REENTRY_HOURS", "12"))
+entry_gate = create_gate()
+
+# Nedavni reading_id, da ponovljeni zahtjevi klijenata ne dođu do baze
+dedupe_cache = DedupeCache(
+    max_size=int(os.getenv("DEDUPE_CACHE_SIZE", "100000")),
+    ttl=float(os.getenv("DEDUPE_TTL", "600")),
+)
+
+# Token bucket po kameri (INGEST_RATE, INGEST_BURST) i ograničenje istodobnih upisa
+rate_limiter = create_rate_limiter()
+ingest_slots = create_concurrency_limit()
+
+journey_cache = JourneyCache(max_size=int(os.getenv("JOURNEY_CACHE_SIZE", "1000")))
+
+# Odgovori ruta koje samo čitaju; svaki upis ih poništava
+response_cache = ResponseCache(
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "5")),
+    max_size=int(os.getenv("RESPONSE_CACHE_SIZE", "256")),
+)
+
+
+def record_written(items):
+    for item in items:
+        stats_engine.apply(item)
+        section_speed.apply(item)
+        od_matrix.apply(item)
+        journey_cache.invalidate(item.get("vehicle_id"))
+    traffic.append(items)
+    response_cache.invalidate()
+    change_feed.publish(items)
+
+
+def unapplied_duplicates(duplicates):
+    # Duplikat iz spremišta čiji raniji upis nije uspio do kraja možda nije primijenjen
+    unapplied = dedupe_cache.take_unapplied(reading_ids(duplicates))
+    return [item for item in duplicates if item.get("reading_id") in unapplied]
+
+
+def write_items(items):
+    written = storage.put_batch(items)
+    written_ids = {id(item) for item in written}
+    duplicates = [item for item in items if id(item) not in written_ids]
+    if duplicates:
+        ingest_duplicates.inc("storage", amount=len(duplicates))
+    record_written(written + unapplied_duplicates(duplicates))
+    return written
+
+
+def write_queued(items):
+    write_items(items)
+    # Do upisa je reading_id zauzet, pa ponovljeni zahtjev dobiva 409 umjesto "duplicate"
+    dedupe_cache.complete(reading_ids(items))
+
+
+def drop_queued(items):
+    # Serija iz reda nije upisana: klijent je smije poslati ponovno, a vozilo ponovno ući
+    write_behind_dropped.inc(amount=len(items))
+    release_items(items, maybe_written=True)
+
+
+# Opcionalni write-behind način: očitanja se potvrđuju odmah, a upisuju u serijama
+write_queue = None
+if os.getenv("WRITE_BEHIND", "").lower() in ("1", "true"):
+    write_queue = WriteBehindQueue(
+        write_queued,
+        on_drop=drop_queued,
+        max_size=int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "10000")),
+        batch_size=int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100")),
+        max_age=float(os.getenv("WRITE_BEHIND_MAX_AGE", "0.5")),
     )
 
-    return len(response.get("Items", [])) == 0
+
+def reentry_response():
+    return JSONResponse(
+        status_code=409,
+        content={"status": "error", "reason": f"vozilo je već ušlo u zadnjih {REENTRY_HOURS} sati"},
+    )
+
+
+def in_progress_response():
+    return JSONResponse(
+        status_code=409,
+        content={"status": "error", "reason": "očitanje s istim reading_id se upravo upisuje"},
+        headers={"Retry-After": "1"},
+    )
+
+
+def rate_limited_response(camera_id, wait):
+    return JSONResponse(
+        status_code=429,
+        content={"status": "error", "reason": f"prekoračeno ograničenje upisa za kameru {camera_id}"},
+        headers={"Retry-After": retry_after(wait)},
+    )
+
+
+def overloaded_response():
+    return JSONResponse(
+        status_code=503,
+        content={"status": "error", "reason": "server je preopterećen, pokušaj ponovno"},
+        headers={"Retry-After": "1"},
+    )
+
+
+def queue_full_response():
+    return JSONResponse(
+        status_code=503,
+        content={"status": "error", "reason": "red za upis je pun, pokušaj ponovno"},
+        headers={"Retry-After": "1"},
+    )
+
+
+ingest_shed = metrics.counter("ingest_shed_total", "Odbijeni zahtjevi za upis po razlogu", ("reason",))
+rate_limited_readings = metrics.counter("ingest_rate_limited_readings_total", "Očitanja odbijena ograničenjem po kameri")
+write_behind_dropped = metrics.counter("write_behind_dropped_total", "Očitanja iz reda koja nisu upisana ni nakon ponovnih pokušaja")
+ingest_duplicates = metrics.counter("ingest_duplicates_total", "Ponovljena očitanja po mjestu otkrivanja", ("source",))
+gate_checks = metrics.counter("entry_gate_checks_total", "Provjere ponovnog ulaza po ishodu", ("result",))
+metrics.gauge("ingest_in_flight", "Zahtjevi za upis koji se trenutno obrađuju", lambda: ingest_slots.active)
+metrics.gauge("rate_limit_cameras", "Kamere s aktivnim token bucketom", lambda: len(rate_limiter.buckets))
+metrics.gauge("dedupe_cache_entries", "Zapamćeni reading_id", lambda: len(dedupe_cache.entries))
+metrics.gauge("write_behind_queue_depth", "Očitanja u write-behind redu", lambda: write_queue.depth if write_queue else 0)
+metrics.gauge("change_feed_buffered_events", "Događaji u međuspremniku feeda", lambda: len(change_feed.events))
+metrics.gauge("change_feed_subscribers", "Spojeni pretplatnici na /readings/stream", lambda: len(change_feed.waiters))
+metrics.gauge("section_speed_tracked_vehicles", "Vozila praćena za prosječnu brzinu", lambda: len(section_speed.vehicles))
+metrics.gauge("od_matrix_pending_vehicles", "Vozila s neuparenim ulazom ili izlazom", lambda: len(od_matrix.pending))
+metrics.gauge("analytics_rows", "Očitanja u stupcima za /analytics/traffic", lambda: traffic.size)
+metrics.gauge(
+    "cache_requests",
+    "Pogoci i promašaji međuspremnika",
+    lambda: {
+        ("journey", "hit"): journey_cache.hits,
+        ("journey", "miss"): journey_cache.misses,
+        ("response", "hit"): response_cache.hits,
+        ("response", "miss"): response_cache.misses,
+    },
+    ("cache", "result"),
+)
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Oznaka je predložak rute (npr. /vehicles/{vehicle_id}/journey), ne stvarni URL
+    route = request.scope.get("route")
+    route_path = route.path if route else "unmatched"
+    metrics.http_requests.inc(request.method, route_path, response.status_code)
+    metrics.http_latency.observe(time.perf_counter() - start, request.method, route_path)
+    return response
+
+
+def shed_when_busy(endpoint):
+    """Odbija upis s 503 kad je već INGEST_MAX_CONCURRENCY zahtjeva u obradi, prije čitanja tijela."""
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        if not ingest_slots.try_acquire():
+            ingest_shed.inc("concurrency")
+            return overloaded_response()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            ingest_slots.release()
+
+    return wrapper
+
+
+def can_enter(vehicle_id: str, storage, hours: int = 12) -> bool:
+    cutoff_str = format_timestamp(datetime.now() - timedelta(hours=hours))
+
+    # Upit nad indeksom po vozilu umjesto skeniranja cijele tablice
+    return not storage.has_entrance_since(vehicle_id, cutoff_str)
+
+
+async def admit_entrance(item) -> bool:
+    """Provjera ponovnog ulaza; spremište se pita samo kad Bloom filter kaže "možda"."""
+    if not entry_gate or reading_type(item) != "entrance":
+        return True
+    vehicle_id = item["vehicle_id"]
+
+    allowed = entry_gate.check(vehicle_id)
+    if allowed is None:
+        allowed = await run_read(can_enter, vehicle_id, storage, REENTRY_HOURS)
+        gate_checks.inc("storage_allowed" if allowed else "storage_denied")
+    else:
+        gate_checks.inc("bloom_negative" if allowed else "recent_entrance")
+
+    # admit ponovno provjerava pod lockom, za istodobne zahtjeve istog vozila
+    return allowed and entry_gate.admit(vehicle_id, reading_seconds(item) or time.time())
+
+
+def claim_reading(item):
+    """None za novo očitanje (ili bez reading_id), inače PENDING ili DONE."""
+    if not item.get("reading_id"):
+        return None
+    state = dedupe_cache.claim(item["reading_id"])
+    if state == DONE:
+        ingest_duplicates.inc("cache")
+    return state
+
+
+def reading_ids(items):
+    return [item["reading_id"] for item in items if item.get("reading_id")]
+
+
+def release_items(items, maybe_written=False):
+    # Upis nije uspio, pa ulaz ne smije blokirati vozilo, a klijent smije ponoviti zahtjev.
+    # maybe_written: greška je nastala tijekom upisa, pa su očitanja možda ipak zapisana
+    dedupe_cache.release(reading_ids(items), maybe_written)
+    if entry_gate:
+        for item in items:
+            if reading_type(item) == "entrance":
+                entry_gate.release(item["vehicle_id"])
+
+
+def all_items():
+    # Statistika je za cijelo razdoblje, pa uključuje i arhivirana očitanja
+    return itertools.chain(cold_archive.iter_items(), storage.scan_all())
+
+
+@app.on_event("startup")
+def load_statistics():
+    # Što nije učitano iz snimke, računa se iz arhive i spremišta. Snimke postoje
+    # samo nakon urednog gašenja (učitavanjem se brišu), pa nikad nisu zastarjele.
+    rebuilt = []
+    if stats_engine.load():
+        print("Statistika učitana iz snimke.")
+    else:
+        rebuilt.append(stats_engine)
+    if od_matrix.load():
+        print("OD matrica učitana iz snimke.")
+    else:
+        rebuilt.append(od_matrix)
+
+    if rebuilt:
+        print("Izračunavam statistiku iz tablice...")
+        for engine in rebuilt:
+            engine.reset()
+        for item in cold_archive.iter_items():
+            for engine in rebuilt:
+                engine.apply(item)
+
+    # Jedno skeniranje spremišta puni i sve što se računa ispočetka i stupce za analitiku
+    def hot_items():
+        for item in storage.scan_all():
+            for engine in rebuilt:
+                engine.apply(item)
+            if entry_gate:
+                entry_gate.observe(item)
+            yield item
+
+    traffic.rebuild(cold_archive, hot_items())
+
+
+@app.on_event("startup")
+def start_write_queue():
+    if write_queue:
+        write_queue.start()
+
+
+@app.on_event("shutdown")
+def stop_write_queue():
+    if write_queue:
+        print(f"Upisujem preostalih {write_queue.depth} očitanja iz reda...")
+        write_queue.stop()
+
+
+@app.on_event("shutdown")
+def save_statistics():
+    stats_engine.save()
+    od_matrix.save()
+
+
+@app.on_event("shutdown")
+def stop_db_executors():
+    async_db.shutdown()
+    storage.close()
+
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "Server radi!"}
 
-@app.post("/readings")
-def add_reading(reading: Reading):
-    table = dynamodb_client.Table(TABLE_NAME)
 
+def prepare_item(reading: Reading, idempotency_key=None):
     item = reading.model_dump()
 
     if not item.get("vehicle_id"):
-        return {"status": "error", "reason": "vehicle_id je obavezno"}
+        return None, "vehicle_id je obavezno"
+    # reading_id se sprema samo kad ga klijent pošalje (u tijelu ili zaglavlju Idempotency-Key)
+    reading_id = item.pop("reading_id", None) or idempotency_key
+    if reading_id:
+        item["reading_id"] = reading_id
     if not item.get("timestamp"):
-        item["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        item["timestamp"] = now_timestamp()
+
+    return item, None
 
-    table.put_item(Item=item)
 
-    return {"status": "success", "data": reading}
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/readings", openapi_extra=openapi_body(Reading.model_json_schema()))
+@shed_when_busy
+async def add_reading(request: Request, idempotency_key: Optional[str] = Header(None)):
+    # JSON, NDJSON ili msgpack, po želji gzip (wire.py)
+    reading, error_response = await parse_readings(request, many=False)
+    if error_response:
+        return error_response
+    wait = rate_limiter.take(reading.camera_id)
+    if wait:
+        ingest_shed.inc("rate_limit")
+        rate_limited_readings.inc()
+        return rate_limited_response(reading.camera_id, wait)
+    item, error = prepare_item(reading, idempotency_key)
+    if error:
+        return {"status": "error", "reason": error}
+    state = claim_reading(item)
+    if state == DONE:
+        return {"status": "duplicate", "data": reading}
+    if state:
+        return in_progress_response()
+    claimed = reading_ids([item])
+    try:
+        if not await admit_entrance(item):
+            return reentry_response()
+
+        if write_queue:
+            if not write_queue.offer([item]):
+                release_items([item])
+                return queue_full_response()
+            # Red ga označava upisanim nakon upisa serije (write_queued) ili oslobađa (drop_queued)
+            claimed = []
+            return {"status": "queued", "data": reading}
+
+        try:
+            written = await run_write(storage.put, item)
+        except Exception:
+            # Bilo koja greška (i prekid veze s bazom, ne samo StorageError): upis možda nije uspio
+            release_items([item], maybe_written=True)
+            raise
+        applied = [item] if written else unapplied_duplicates([item])
+        dedupe_cache.complete(reading_ids([item]))
+        if applied:
+            record_written(applied)
+        if not written:
+            ingest_duplicates.inc("storage")
+            return {"status": "duplicate", "data": reading}
+        return {"status": "success", "data": reading}
+    finally:
+        # Zauzeti reading_id koji nije označen upisanim oslobađa se na svakom izlazu, i pri iznimci
+        dedupe_cache.release(claimed)
+
+
+@app.post("/readings/batch", openapi_extra=openapi_body({"type": "array", "items": Reading.model_json_schema()}))
+@shed_when_busy
+async def add_readings_batch(request: Request):
+    readings, error_response = await parse_readings(request, many=True)
+    if error_response:
+        return error_response
+
+    # Tokeni se uzimaju za sva očitanja jedne kamere odjednom
+    per_camera = Counter(reading.camera_id for reading in readings)
+    waits = {camera_id: rate_limiter.take(camera_id, count) for camera_id, count in per_camera.items()}
+    limited = {camera_id: wait for camera_id, wait in waits.items() if wait}
+    if limited:
+        rate_limited_readings.inc(amount=sum(per_camera[camera_id] for camera_id in limited))
+        if len(limited) == len(per_camera):
+            ingest_shed.inc("rate_limit")
+            camera_id = max(limited, key=limited.get)
+            return rate_limited_response(camera_id, limited[camera_id])
+
+    results = []
+    items = []
+    batch_ids = set()
+    batch_keys = set()
+    # reading_id zauzeti u ovom zahtjevu; oni koji nisu upisani oslobađaju se u finally
+    claimed = []
+    try:
+        for index, reading in enumerate(readings):
+            if reading.camera_id in limited:
+                results.append({
+                    "index": index,
+                    "status": "error",
+                    "reason": f"prekoračeno ograničenje upisa za kameru {reading.camera_id}",
+                    "retry_after": int(retry_after(limited[reading.camera_id])),
+                })
+                continue
+            item, error = prepare_item(reading)
+            key = None if error else storage.storage_key(item)
+            if not error:
+                # Isti reading_id dvaput u seriji: drugi je duplikat prvog
+                state = DONE if item.get("reading_id") in batch_ids else claim_reading(item)
+                if state is None:
+                    claimed.extend(reading_ids([item]))
+                if state == DONE:
+                    results.append({"index": index, "status": "duplicate"})
+                    continue
+                if key is not None and key in batch_keys:
+                    # Spremište bi njime prepisalo ranije očitanje iz serije, a oba bi se brojala upisanima
+                    error = "očitanje ima isti ključ (kamera i vrijeme) kao ranije očitanje u seriji"
+                elif state:
+                    error = "očitanje s istim reading_id se upravo upisuje"
+                elif not await admit_entrance(item):
+                    error = f"vozilo je već ušlo u zadnjih {REENTRY_HOURS} sati"
+            if error:
+                results.append({"index": index, "status": "error", "reason": error})
+            else:
+                results.append({"index": index, "status": "success", "item": item})
+                items.append(item)
+                batch_ids.update(reading_ids([item]))
+                batch_keys.add(key)
+
+        if write_queue:
+            if not write_queue.offer(items):
+                release_items(items)
+                for result in results:
+                    result.pop("item", None)
+                return queue_full_response()
+            # Očitanja u redu ostaju zauzeta dok ih red ne upiše ili odbaci
+            queued_ids = set(reading_ids(items))
+            claimed = [reading_id for reading_id in claimed if reading_id not in queued_ids]
+            for result in results:
+                if result.pop("item", None):
+                    result["status"] = "queued"
+            return {"status": "queued", "written": 0, "queued": len(items), "results": results}
+
+        try:
+            written = await run_write(write_items, items)
+        except StorageError as e:
+            release_items(items, maybe_written=True)
+            reason = str(e)
+            for result in results:
+                if result.pop("item", None):
+                    result.update(status="error", reason=reason)
+            return {"status": "error", "written": 0, "results": results}
+        dedupe_cache.complete(reading_ids(items))
+
+        written_ids = {id(item) for item in written}
+        for result in results:
+            item = result.pop("item", None)
+            if item is not None and id(item) not in written_ids:
+                result["status"] = "duplicate"
+        accepted = sum(result["status"] != "error" for result in results)
+        status = "success" if accepted == len(results) else "partial"
+        return {"status": status, "written": len(written), "results": results}
+    except Exception:
+        # Provjera ulaza ili upis nije uspio (npr. prekid veze s bazom), pa je upis možda djelomičan
+        release_items(items, maybe_written=True)
+        raise
+    finally:
+        dedupe_cache.release(claimed)
 
 
 @app.get("/readings")
-def get_all_readings():
-    table = dynamodb_client.Table(TABLE_NAME)
+async def get_all_readings(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    try:
+        start_key = decode_cursor(cursor)
+    except ValueError as e:
+        return {"status": "error", "reason": str(e)}
+
+    # NDJSON: stranice se šalju klijentu čim stignu, bez skupljanja cijele tablice u memoriji
+    if format == "ndjson":
+        return StreamingResponse(
+            ndjson_lines(storage, limit, start_key),
+            media_type="application/x-ndjson",
+        )
 
-    response = table.scan()
-    items = response.get("Items", [])
+    # Cijela tablica bez stranica se ne sprema u međuspremnik, jer je ograničen brojem odgovora, ne veličinom
+    if not (limit or start_key):
+        items = await run_read(lambda: list(storage.scan_all()))
+        return {"count": len(items), "data": items}
 
-    while "LastEvaluatedKey" in response:
-        response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"])
-        items.extend(response.get("Items", []))
+    # Jedna stranica s cursorom za sljedeću
+    async def compute():
+        items, last_key = await run_read(storage.scan_page, limit, start_key)
+        return {"count": len(items), "data": items, "next_cursor": encode_cursor(last_key)}
 
-    return {"count": len(items), "data": items}
+    return await response_cache.respond(request, compute)
+
+
+@app.get("/readings/stream")
+async def stream_readings(
+    types: Optional[str] = None,
+    cursor: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+):
+    selected = None
+    if types:
+        selected = {reading_type.strip() for reading_type in types.split(",")}
+        unknown = selected - set(READING_TYPES)
+        if unknown:
+            return {"status": "error", "reason": f"nepoznat tip: {', '.join(sorted(unknown))}"}
+
+    # Last-Event-ID šalje preglednik/klijent pri ponovnom spajanju
+    return StreamingResponse(
+        change_feed.subscribe(last_event_id or cursor, selected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
 
 
 @app.get("/stats")
-def get_statistics():
-    table = dynamodb_client.Table(TABLE_NAME)
+async def get_statistics(request: Request, rebuild: bool = False):
+    if rebuild:
+        await run_read(stats_engine.rebuild, all_items())
+        response_cache.invalidate()
 
-    response = table.scan()
-    items = response.get("Items", [])
-    while "LastEvaluatedKey" in response:
-        response = table.scan(ExclusiveStartKey=response["LastEvaluatedKey"])
-        items.extend(response.get("Items", []))
+    async def compute():
+        return {"statistics": stats_engine.statistics()}
 
-    entrances = {"PULA-ENTRANCE": set(), "RIJEKA-ENTRANCE": set(), "UMAG-ENTRANCE": set()}
-    cameras = {}
-    exits = {}
+    return await response_cache.respond(request, compute)
 
-    for item in items:
-        vehicle_id = item.get("vehicle_id")
-        camera_id = item.get("camera_id")
-        is_entrance = str(item.get("is_entrance")).lower() == "true"
-        is_camera = str(item.get("is_camera")).lower() == "true"
-
-        if not vehicle_id or not camera_id:
-            continue
-
-        # Vozila na ulazima
-        if is_entrance and camera_id in entrances:
-            entrances[camera_id].add(vehicle_id)
-
-        # Vozila koja su prošla pored kamera
-        if is_camera:
-            if camera_id not in cameras:
-                cameras[camera_id] = set()
-            cameras[camera_id].add(vehicle_id)
-
-        # Vozila koja su izašla
-        if not is_entrance and not is_camera:
-            if camera_id not in exits:
-                exits[camera_id] = set()
-            exits[camera_id].add(vehicle_id)
-
-    # Koliko vozila je prošlo pored kamere sa svakog od ulaza
-    detailed_stats = {}
-    for entrance, vehicles in entrances.items():
-        detailed_stats[entrance] = {
-            "total_entrances": len(vehicles),
-            "passed_cameras": {},
-            "exited": {}
-        }
-        for cam_id, cam_vehicles in cameras.items():
-            passed = len(vehicles.intersection(cam_vehicles))
-            detailed_stats[entrance]["passed_cameras"][cam_id] = passed
-        # Izlazi
-        for exit_id, exit_vehicles in exits.items():
-            exited_count = len(vehicles.intersection(exit_vehicles))
-            detailed_stats[entrance]["exited"][exit_id] = exited_count
-
-    return {"statistics": detailed_stats}
+
+@app.get("/stats/history")
+async def get_statistics_history(
+    request: Request,
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+):
+    async def compute():
+        try:
+            return await run_read(cold_archive.statistics, start, end)
+        except ValueError:
+            return {"status": "error", "reason": "from i to moraju biti u obliku YYYY-MM-DD HH:MM:SS"}
+
+    # Samo arhivirana očitanja; nedavna su u /stats
+    return await response_cache.respond(request, compute)
+
+
+@app.get("/analytics/traffic")
+async def get_traffic(
+    request: Request,
+    bucket: str = Query("hour", pattern="^(" + "|".join(BUCKETS) + ")$"),
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+    camera_ids: Optional[str] = None,
+):
+    ids = [camera_id.strip() for camera_id in camera_ids.split(",") if camera_id.strip()] if camera_ids else None
+
+    async def compute():
+        try:
+            return await run_read(traffic.traffic, bucket, start, end, ids)
+        except ValueError:
+            return {"status": "error", "reason": "from i to moraju biti u obliku YYYY-MM-DD HH:MM:SS"}
+
+    return await response_cache.respond(request, compute)
+
+
+def time_range_error(start, end):
+    # Provjera prije upita: inače bi spremišta bez vremenskog sort ključa za neispravan oblik vratila prazan popis
+    try:
+        for value in (start, end):
+            if value is not None:
+                parse_timestamp(value)
+    except ValueError:
+        return {"status": "error", "reason": "from i to moraju biti u obliku YYYY-MM-DD HH:MM:SS"}
+    return None
+
+
+@app.get("/cameras/readings")
+async def get_cameras_readings(
+    request: Request,
+    camera_ids: str,
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    try:
+        cursors = decode_cursor(cursor)
+    except ValueError as e:
+        return {"status": "error", "reason": str(e)}
+    error = time_range_error(start, end)
+    if error:
+        return error
+
+    async def compute():
+        ids = [camera_id.strip() for camera_id in camera_ids.split(",") if camera_id.strip()]
+        items, next_cursors = await run_read(storage.query_cameras, ids, start, end, limit, cursors)
+
+        return {"count": len(items), "data": items, "next_cursor": encode_cursor(next_cursors)}
+
+    return await response_cache.respond(request, compute)
+
+
+@app.get("/cameras/{camera_id}/readings")
+async def get_camera_readings(
+    request: Request,
+    camera_id: str,
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    try:
+        cursors = decode_cursor(cursor)
+    except ValueError as e:
+        return {"status": "error", "reason": str(e)}
+    error = time_range_error(start, end)
+    if error:
+        return error
+
+    # Očitanja kamere mogu biti raspoređena po više particija (SHARD_COUNT)
+    async def compute():
+        items, next_cursors = await run_read(storage.query_cameras, [camera_id], start, end, limit, cursors)
+
+        return {"count": len(items), "data": items, "next_cursor": encode_cursor(next_cursors)}
+
+    return await response_cache.respond(request, compute)
+
+
+@app.get("/section-speed")
+async def get_section_speed():
+    return section_speed.summary()
+
+
+@app.get("/section-speed/violations")
+async def get_section_speed_violations(limit: int = Query(100, ge=1, le=1000)):
+    violations = section_speed.recent_violations(limit)
+    return {"count": len(violations), "data": violations}
+
+
+@app.get("/od-matrix")
+async def get_od_matrix(
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+):
+    try:
+        return od_matrix.matrix(start, end)
+    except ValueError:
+        return {"status": "error", "reason": "from i to moraju biti u obliku YYYY-MM-DD HH:MM:SS"}
+
+
+@app.get("/vehicles/{vehicle_id}/journey")
+async def get_vehicle_journey(vehicle_id: str):
+    journey, token = journey_cache.get(vehicle_id)
+    if journey is None:
+        items = await run_read(storage.query_vehicle, vehicle_id)
+        journey = build_journey(vehicle_id, items)
+        journey_cache.put(vehicle_id, journey, token)
+
+    return journey
@@ -0,0 +1,201 @@
+import bisect
+import threading
+import time
+
+from boto3.dynamodb.table import BatchWriter
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, labels):
+    if not labelnames:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for labels, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def observe(self, value, *labels):
+        with self.lock:
+            counts, total = self.values.get(labels, (None, 0.0))
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.values[labels] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        labelnames = self.labelnames + ("le",)
+        with self.lock:
+            for labels, (counts, total) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(labelnames, labels + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Vrijednost se čita tek pri generiranju /metrics, pozivom `function`.
+
+    Funkcija vraća broj ili rječnik {tuple oznaka: broj}.
+    """
+
+    def __init__(self, name, documentation, function, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self.labelnames = labelnames
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        value = self.function()
+        values = value if isinstance(value, dict) else {(): value}
+        for labels, label_value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {label_value}")
+        return lines
+
+
+registry = []
+
+
+def counter(name, documentation, labelnames=()):
+    metric = Counter(name, documentation, labelnames)
+    registry.append(metric)
+    return metric
+
+
+def histogram(name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+    metric = Histogram(name, documentation, labelnames, buckets)
+    registry.append(metric)
+    return metric
+
+
+def gauge(name, documentation, function, labelnames=()):
+    metric = Gauge(name, documentation, function, labelnames)
+    registry.append(metric)
+    return metric
+
+
+def render() -> str:
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+http_requests = counter("http_requests_total", "Broj HTTP zahtjeva", ("method", "route", "status"))
+http_latency = histogram("http_request_duration_seconds", "Trajanje HTTP zahtjeva", ("method", "route"))
+
+db_calls = counter("dynamodb_calls_total", "Broj poziva prema DynamoDB-u", ("operation", "outcome"))
+db_latency = histogram("dynamodb_call_duration_seconds", "Trajanje poziva prema DynamoDB-u", ("operation",))
+db_capacity = counter("dynamodb_consumed_capacity_units_total", "Potrošeni kapacitet po operaciji", ("operation",))
+db_items_scanned = counter("dynamodb_items_scanned_total", "Pročitane stavke (ScannedCount)", ("operation",))
+db_items_returned = counter("dynamodb_items_returned_total", "Vraćene stavke (Count)", ("operation",))
+
+
+def _record_call(operation, call, kwargs):
+    kwargs.setdefault("ReturnConsumedCapacity", "TOTAL")
+    start = time.perf_counter()
+    try:
+        response = call(**kwargs)
+    except Exception:
+        db_calls.inc(operation, "error")
+        db_latency.observe(time.perf_counter() - start, operation)
+        raise
+    db_calls.inc(operation, "ok")
+    db_latency.observe(time.perf_counter() - start, operation)
+
+    consumed = response.get("ConsumedCapacity")
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    capacity = sum(float(c.get("CapacityUnits", 0)) for c in consumed or [])
+    if capacity:
+        db_capacity.inc(operation, amount=capacity)
+    if "ScannedCount" in response:
+        db_items_scanned.inc(operation, amount=response["ScannedCount"])
+        db_items_returned.inc(operation, amount=response.get("Count", 0))
+    return response
+
+
+class _InstrumentedClient:
+    def __init__(self, client):
+        self._client = client
+
+    def batch_write_item(self, **kwargs):
+        return _record_call("batch_write", self._client.batch_write_item, kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class InstrumentedTable:
+    """Tanki omotač oko boto3 Table koji bilježi trajanje, broj poziva i kapacitet."""
+
+    def __init__(self, table):
+        self._table = table
+
+    def scan(self, **kwargs):
+        return _record_call("scan", self._table.scan, kwargs)
+
+    def query(self, **kwargs):
+        return _record_call("query", self._table.query, kwargs)
+
+    def put_item(self, **kwargs):
+        return _record_call("put", self._table.put_item, kwargs)
+
+    def get_item(self, **kwargs):
+        return _record_call("get", self._table.get_item, kwargs)
+
+    def delete_item(self, **kwargs):
+        return _record_call("delete", self._table.delete_item, kwargs)
+
+    def update_item(self, **kwargs):
+        return _record_call("update", self._table.update_item, kwargs)
+
+    def transact_write_items(self, **kwargs):
+        return _record_call("transact_write", self._table.meta.client.transact_write_items, kwargs)
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return BatchWriter(
+            self._table.name,
+            _InstrumentedClient(self._table.meta.client),
+            overwrite_by_pkeys=overwrite_by_pkeys,
+        )
+
+    def __getattr__(self, name):
+        return getattr(self._table, name)
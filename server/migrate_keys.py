@@ -0,0 +1,61 @@
+import argparse
+
+import sharding
+import sort_keys
+from dynamo import get_table
+
+TABLE_NAME = "Readings"
+
+
+def target_key(item, shard_count, sort_key_format):
+    reading = sort_keys.from_storage(dict(item, camera_id=sharding.camera_of(item["camera_id"])))
+    stored = sort_keys.to_storage(reading, sort_key_format)
+    return sharding.partition_key(reading["camera_id"], reading["vehicle_id"], shard_count), stored
+
+
+def migrate(table, shard_count, sort_key_format, dry_run=False):
+    """Prepisuje očitanja pod ključeve koji odgovaraju zadanoj shemi.
+
+    Shema je zadana brojem particija po kameri i formatom sort ključa. Svako
+    očitanje kojem se ključ mijenja upisuje se pod novim ključem pa se stari
+    zapis briše. Ponovno pokretanje je sigurno, jer se zapisi koji već imaju
+    ispravan ključ preskaču.
+    """
+    moved = 0
+    scanned = 0
+    scan_kwargs = {}
+    with table.batch_writer() as batch:
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response.get("Items", []):
+                scanned += 1
+                camera_key, stored = target_key(item, shard_count, sort_key_format)
+                if camera_key == item["camera_id"] and stored["timestamp"] == item["timestamp"]:
+                    continue
+                moved += 1
+                if dry_run:
+                    continue
+                batch.put_item(Item=dict(stored, camera_id=camera_key))
+                batch.delete_item(Key={"camera_id": item["camera_id"], "timestamp": item["timestamp"]})
+            print(f"Pregledano {scanned} očitanja, premješteno {moved}...")
+            if "LastEvaluatedKey" not in response:
+                break
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return scanned, moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migracija očitanja na novu shemu ključeva")
+    parser.add_argument("--shards", type=int, default=sharding.SHARD_COUNT, help="broj particija po kameri (1 = bez particija)")
+    parser.add_argument("--sort-key", choices=["legacy", "compact"], default=sort_keys.SORT_KEY_FORMAT, help="format sort ključa")
+    parser.add_argument("--dry-run", action="store_true", help="samo prebroji očitanja koja bi se premjestila")
+    args = parser.parse_args()
+
+    import database  # noqa: F401  (stvara tablicu i indeks ako ne postoje)
+
+    scanned, moved = migrate(get_table(TABLE_NAME), args.shards, args.sort_key, args.dry_run)
+    print(f"Gotovo: pregledano {scanned}, {'za premjestiti' if args.dry_run else 'premješteno'} {moved}.")
+
+
+if __name__ == "__main__":
+    main()
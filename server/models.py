@@ -14,3 +14,5 @@ class Reading(BaseModel):
     speed_limit: Optional[int] = None
     timestamp_entrance: Optional[str] = None
     timestamp_exit: Optional[str] = None
+    # Ključ idempotentnosti: ponovljeno slanje istog očitanja upisuje se samo jednom
+    reading_id: Optional[str] = None
@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from operator import itemgetter
+
+from feed import reading_type
+from timeutil import expire_before, format_seconds, reading_seconds, to_seconds
+
+
+class ODMatrix:
+    """Matrica ishodište–odredište (ulaz → izlaz) koja se ažurira pri svakom upisu.
+
+    Za svako vozilo pamte se neupareni ulazi i izlazi. Izlaz se uparuje sa
+    zadnjim ranijim ulazom istog vozila, a ulaz koji stigne kasnije s prvim
+    izlazom nakon njega, pa redoslijed dolaska očitanja nije bitan. Svako
+    putovanje se broji u ukupnoj matrici i u intervalu (`bucket` sekundi)
+    vremena izlaza; intervali stariji od `window` sekundi se brišu.
+
+    Snimka se sprema samo pri gašenju i briše pri učitavanju, pa se nakon
+    pada servera matrica računa iz tablice.
+    """
+
+    def __init__(self, snapshot_file=None, window=7 * 24 * 3600, bucket=60, state_ttl=24 * 3600, max_events=8):
+        self.snapshot_file = snapshot_file
+        self.window = window
+        self.bucket = bucket
+        self.state_ttl = state_ttl
+        self.max_events = max_events
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pending = OrderedDict()
+        self.cumulative = {}
+        self.buckets = {}
+        self.latest = 0
+
+    def apply(self, item: dict):
+        kind = reading_type(item)
+        if kind not in ("entrance", "exit"):
+            return
+        vehicle_id = item.get("vehicle_id")
+        point = item.get("camera_id")
+        seen_at = reading_seconds(item)
+        if seen_at is None:
+            return
+        event = (seen_at, kind, point)
+
+        with self.lock:
+            now = time.monotonic()
+            # Vozila su poredana po zadnjem očitanju
+            expire_before(self.pending, now - self.state_ttl, itemgetter(0))
+            _, events = self.pending.pop(vehicle_id, (None, []))
+            if event not in events:
+                if kind == "exit":
+                    earlier = [e for e in events if e[1] == "entrance" and e[0] <= seen_at]
+                    match = max(earlier) if earlier else None
+                    trip = (match, event)
+                else:
+                    later = [e for e in events if e[1] == "exit" and e[0] >= seen_at]
+                    match = min(later) if later else None
+                    trip = (event, match)
+
+                if match:
+                    events.remove(match)
+                    self._record(*trip)
+                else:
+                    events.append(event)
+                    events.sort()
+                    del events[:-self.max_events]
+            if events:
+                self.pending[vehicle_id] = (now, events)
+
+    @staticmethod
+    def _add(matrix, pair, duration):
+        count, total = matrix.get(pair, (0, 0.0))
+        matrix[pair] = (count + 1, total + duration)
+
+    def _record(self, entrance, exit_event):
+        pair = (entrance[2], exit_event[2])
+        duration = exit_event[0] - entrance[0]
+        self._add(self.cumulative, pair, duration)
+
+        exited_at = exit_event[0]
+        if exited_at < self.latest - self.window:
+            return
+        bucket = int(exited_at // self.bucket) * self.bucket
+        if bucket not in self.buckets:
+            self.buckets[bucket] = {}
+            self.latest = max(self.latest, exited_at)
+            cutoff = self.latest - self.window
+            for old in [b for b in self.buckets if b + self.bucket <= cutoff]:
+                del self.buckets[old]
+        self._add(self.buckets[bucket], pair, duration)
+
+    def matrix(self, start=None, end=None) -> dict:
+        """Putovanja po paru ulaz → izlaz; s `start`/`end` samo ona s izlazom u tom rasponu."""
+        start_at = to_seconds(start) if start else None
+        end_at = to_seconds(end) if end else None
+
+        with self.lock:
+            window_start = self.latest - self.window if self.latest else None
+            if start_at is None and end_at is None:
+                totals = dict(self.cumulative)
+                complete = True
+            else:
+                totals = {}
+                for bucket, pairs in self.buckets.items():
+                    if (start_at is not None and bucket + self.bucket <= start_at) or (end_at is not None and bucket > end_at):
+                        continue
+                    for pair, (count, duration) in pairs.items():
+                        total_count, total_duration = totals.get(pair, (0, 0.0))
+                        totals[pair] = (total_count + count, total_duration + duration)
+                # Raspon koji počinje prije prozora nema sva putovanja
+                complete = start_at is not None and (window_start is None or start_at >= window_start)
+
+        matrix = {}
+        for (entrance, exit_id), (count, duration) in sorted(totals.items()):
+            matrix.setdefault(entrance, {})[exit_id] = {
+                "count": count,
+                "avg_minutes": round(duration / count / 60, 1),
+            }
+        return {
+            "from": start,
+            "to": end,
+            "complete": complete,
+            "window_start": format_seconds(window_start) if window_start else None,
+            "total": sum(count for count, _ in totals.values()),
+            "matrix": matrix,
+        }
+
+    def save(self):
+        if not self.snapshot_file:
+            return
+        with self.lock:
+            data = {
+                "latest": self.latest,
+                "cumulative": [[*pair, count, duration] for pair, (count, duration) in self.cumulative.items()],
+                "buckets": [
+                    [bucket, *pair, count, duration]
+                    for bucket, pairs in self.buckets.items()
+                    for pair, (count, duration) in pairs.items()
+                ],
+                "pending": {vehicle_id: events for vehicle_id, (_, events) in self.pending.items()},
+            }
+        tmp_file = self.snapshot_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_file, self.snapshot_file)
+
+    def load(self) -> bool:
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return False
+        try:
+            with open(self.snapshot_file, "r") as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            print(f"Upozorenje: {self.snapshot_file} je oštećen. OD matrica će se ponovno izračunati.")
+            return False
+        # Kao i kod statistike: snimka vrijedi samo do prvog sljedećeg upisa
+        os.remove(self.snapshot_file)
+
+        with self.lock:
+            self.reset()
+            self.latest = data["latest"]
+            self.cumulative = {(entrance, exit_id): (count, duration) for entrance, exit_id, count, duration in data["cumulative"]}
+            for bucket, entrance, exit_id, count, duration in data["buckets"]:
+                self.buckets.setdefault(bucket, {})[(entrance, exit_id)] = (count, duration)
+            # Rok za neuparena očitanja počinje ispočetka
+            now = time.monotonic()
+            for vehicle_id, events in data["pending"].items():
+                self.pending[vehicle_id] = (now, [tuple(event) for event in events])
+        return True
+
+
+def create_engine():
+    return ODMatrix(
+        snapshot_file=os.getenv("OD_SNAPSHOT_FILE"),
+        window=int(os.getenv("OD_WINDOW", str(7 * 24 * 3600))),
+        bucket=int(os.getenv("OD_BUCKET", "60")),
+        state_ttl=int(os.getenv("OD_STATE_TTL", str(24 * 3600))),
+    )
@@ -0,0 +1,51 @@
+import base64
+import json
+from decimal import Decimal
+
+from async_db import run_read
+
+NDJSON_PAGE_SIZE = 1000
+
+
+def _default(value):
+    # DynamoDB vraća brojeve kao Decimal
+    if isinstance(value, Decimal):
+        return int(value) if value % 1 == 0 else float(value)
+    raise TypeError(f"{type(value).__name__} nije JSON serijalizabilan")
+
+
+def to_json(data) -> str:
+    return json.dumps(data, default=_default, ensure_ascii=False)
+
+
+def encode_cursor(key):
+    if not key:
+        return None
+    return base64.urlsafe_b64encode(to_json(key).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Vraća cursor spremišta; ValueError ako cursor nije ispravan."""
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("neispravan cursor")
+    if not isinstance(key, dict):
+        raise ValueError("neispravan cursor")
+    return key
+
+
+async def ndjson_lines(storage, limit=None, cursor=None):
+    """Očitanja kao NDJSON, stranicu po stranicu kako stižu iz spremišta.
+
+    Nakon svake stranice šalje se i redak s cursorom, tako da klijent može
+    nastaviti od zadnje primljene stranice ako se veza prekine.
+    """
+    while True:
+        items, cursor = await run_read(storage.scan_page, limit or NDJSON_PAGE_SIZE, cursor)
+        yield "".join(to_json(item) + "\n" for item in items)
+        yield to_json({"next_cursor": encode_cursor(cursor)}) + "\n"
+        if not cursor:
+            return
@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Response
+
+from paging import to_json
+
+
+class ResponseCache:
+    """Međuspremnik JSON odgovora za rute koje samo čitaju.
+
+    Ključ je putanja s parametrima upita. Svaki upis povećava generaciju
+    (`invalidate`), čime svi spremljeni odgovori zastarijevaju; osim toga
+    vrijedi TTL i LRU ograničenje veličine. Istodobni zahtjevi za isti ključ
+    čekaju jedno izračunavanje. ETag je sažetak tijela odgovora, pa klijent
+    dobiva 304 i nakon upisa koji nije promijenio rezultat.
+    """
+
+    def __init__(self, ttl=5.0, max_size=256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        with self.lock:
+            self.generation += 1
+
+    def _lookup(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None, self.generation
+            generation, expires_at, body, etag = entry
+            if generation != self.generation or expires_at < time.monotonic():
+                del self.entries[key]
+                return None, self.generation
+            self.entries.move_to_end(key)
+            return (body, etag), self.generation
+
+    def _store(self, key, generation, body, etag):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = (generation, time.monotonic() + self.ttl, body, etag)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    async def _compute(self, key, generation, compute):
+        data = await compute()
+        body = to_json(data).encode()
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self._store(key, generation, body, etag)
+        return body, etag
+
+    async def respond(self, request, compute):
+        """`compute` je korutina bez argumenata koja vraća podatke za JSON odgovor."""
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+        cached, generation = self._lookup(key)
+
+        if cached:
+            self.hits += 1
+        else:
+            self.misses += 1
+            inflight_key = (key, generation)
+            task = self.inflight.get(inflight_key)
+            if task is None:
+                task = asyncio.ensure_future(self._compute(key, generation, compute))
+                self.inflight[inflight_key] = task
+                task.add_done_callback(lambda _: self.inflight.pop(inflight_key, None))
+            cached = await asyncio.shield(task)
+
+        body, etag = cached
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
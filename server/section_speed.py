@@ -0,0 +1,139 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from operator import itemgetter
+
+from feed import reading_type
+from timeutil import expire_before, format_seconds, reading_seconds
+
+DEFAULT_SPEED_LIMIT = 130
+
+# Duljine dionica u km između točaka na kojima se vozilo bilježi
+SEGMENTS = {
+    ("RIJEKA-ENTRANCE", "CAMERA1"): 64,
+    ("PULA-ENTRANCE", "CAMERA1"): 100,
+    ("UMAG-ENTRANCE", "CAMERA1"): 64,
+    ("RIJEKA-ENTRANCE", "CAMERA2"): 100,
+    ("PULA-ENTRANCE", "CAMERA2"): 82,
+    ("UMAG-ENTRANCE", "CAMERA2"): 27,
+    ("CAMERA1", "CAMERA2"): 40,
+    ("CAMERA2", "CAMERA1"): 40,
+    ("CAMERA1", "RIJEKA-EXIT"): 64,
+    ("CAMERA1", "PULA-EXIT"): 100,
+    ("CAMERA1", "UMAG-EXIT"): 64,
+    ("CAMERA2", "RIJEKA-EXIT"): 100,
+    ("CAMERA2", "PULA-EXIT"): 82,
+    ("CAMERA2", "UMAG-EXIT"): 27,
+}
+
+
+def load_segments(file_path):
+    """Dionice iz JSON datoteke oblika [{"from": ..., "to": ..., "length_km": ...}]."""
+    if not file_path:
+        return dict(SEGMENTS)
+    with open(file_path, "r") as f:
+        return {(s["from"], s["to"]): s["length_km"] for s in json.load(f)}
+
+
+class SectionSpeedEngine:
+    """Prosječna brzina na dionici (section control).
+
+    Za svako vozilo pamte se nedavni prolazi (ulaz, kamere, izlaz) poredani
+    po vremenu. Novo očitanje uparuje se samo sa susjednim prolazima, pa je
+    obrada O(log n) po očitanju i ne ovisi o redoslijedu dolaska. Vozila bez
+    novih očitanja dulje od `state_ttl` sekundi brišu se iz memorije.
+    """
+
+    def __init__(self, segments=None, state_ttl=6 * 3600, max_passages=8, max_violations=1000):
+        self.segments = segments if segments is not None else dict(SEGMENTS)
+        self.state_ttl = state_ttl
+        self.max_passages = max_passages
+        self.lock = threading.Lock()
+        self.vehicles = OrderedDict()
+        self.violations = deque(maxlen=max_violations)
+        self.segment_stats = {}
+
+    def apply(self, item: dict):
+        kind = reading_type(item)
+        if kind not in ("entrance", "camera", "exit"):
+            return
+        vehicle_id = item.get("vehicle_id")
+        point = item.get("camera_id")
+        passed_at = reading_seconds(item)
+        if passed_at is None:
+            return
+        speed_limit = int(item.get("speed_limit") or DEFAULT_SPEED_LIMIT)
+        passage = (passed_at, point, kind, speed_limit)
+
+        with self.lock:
+            now = time.monotonic()
+            # Vozila su poredana po zadnjem očitanju
+            expire_before(self.vehicles, now - self.state_ttl, itemgetter(0))
+            _, passages = self.vehicles.pop(vehicle_id, (None, []))
+            self.vehicles[vehicle_id] = (now, passages)
+
+            if passage in passages:
+                return
+            index = bisect.bisect(passages, passage)
+            passages.insert(index, passage)
+            if index > 0:
+                self._measure(vehicle_id, passages[index - 1], passage)
+            if index + 1 < len(passages):
+                self._measure(vehicle_id, passage, passages[index + 1])
+            if len(passages) > self.max_passages:
+                del passages[0]
+
+    def _measure(self, vehicle_id, start, end):
+        segment = (start[1], end[1])
+        length_km = self.segments.get(segment)
+        hours = (end[0] - start[0]) / 3600
+        if not length_km or hours <= 0:
+            return
+
+        avg_speed = length_km / hours
+        # Ograničenje bilježi kamera na dionici; ulaz i izlaz ga nemaju pa vrijedi ono s početka
+        speed_limit = end[3] if end[2] == "camera" else start[3]
+        stats = self.segment_stats.setdefault(segment, {"count": 0, "speed_sum": 0.0, "violations": 0})
+        stats["count"] += 1
+        stats["speed_sum"] += avg_speed
+
+        if avg_speed > speed_limit:
+            stats["violations"] += 1
+            self.violations.append({
+                "vehicle_id": vehicle_id,
+                "from": start[1],
+                "to": end[1],
+                "length_km": length_km,
+                "timestamp_from": format_seconds(start[0]),
+                "timestamp_to": format_seconds(end[0]),
+                "avg_speed": round(avg_speed, 1),
+                "speed_limit": speed_limit,
+            })
+
+    def summary(self) -> dict:
+        with self.lock:
+            segments = []
+            for (start, end), stats in sorted(self.segment_stats.items()):
+                segments.append({
+                    "from": start,
+                    "to": end,
+                    "length_km": self.segments.get((start, end)),
+                    "count": stats["count"],
+                    "avg_speed": round(stats["speed_sum"] / stats["count"], 1),
+                    "violations": stats["violations"],
+                })
+            return {"tracked_vehicles": len(self.vehicles), "segments": segments}
+
+    def recent_violations(self, limit=100) -> list:
+        with self.lock:
+            return list(self.violations)[-limit:][::-1]
+
+
+def create_engine():
+    return SectionSpeedEngine(
+        segments=load_segments(os.getenv("SECTION_SEGMENTS_FILE")),
+        state_ttl=int(os.getenv("SECTION_STATE_TTL", str(6 * 3600))),
+    )
@@ -0,0 +1,37 @@
+import os
+import zlib
+
+# Broj particija po kameri; 1 znači da se camera_id zapisuje bez sufiksa
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "1"))
+
+# Dok migracija nije gotova, čitanja uključuju i stare zapise bez sufiksa
+SHARD_READ_UNSHARDED = os.getenv("SHARD_READ_UNSHARDED", "1").lower() in ("1", "true")
+
+SEPARATOR = "#"
+
+
+def shard_of(vehicle_id, shard_count=SHARD_COUNT):
+    return zlib.crc32(vehicle_id.encode()) % shard_count
+
+
+def partition_key(camera_id, vehicle_id, shard_count=SHARD_COUNT):
+    if shard_count <= 1:
+        return camera_id
+    return f"{camera_id}{SEPARATOR}{shard_of(vehicle_id, shard_count)}"
+
+
+def partition_keys(camera_id, shard_count=SHARD_COUNT, include_unsharded=SHARD_READ_UNSHARDED):
+    """Sve vrijednosti hash ključa pod kojima mogu biti očitanja jedne kamere."""
+    if shard_count <= 1:
+        return [camera_id]
+    keys = [f"{camera_id}{SEPARATOR}{shard}" for shard in range(shard_count)]
+    if include_unsharded:
+        keys.append(camera_id)
+    return keys
+
+
+def camera_of(key):
+    camera_id, separator, shard = key.rpartition(SEPARATOR)
+    if separator and shard.isdigit():
+        return camera_id
+    return key
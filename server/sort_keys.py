@@ -0,0 +1,64 @@
+import os
+
+from timeutil import to_seconds
+
+# "compact": epoha u ms + sufiks vozila; "legacy": sort ključ je sam timestamp
+# string (dva očitanja iste kamere u istoj sekundi se prepisuju)
+SORT_KEY_FORMAT = os.getenv("SORT_KEY_FORMAT", "compact")
+
+# Dok stari zapisi nisu prepisani, upiti čitaju oba formata ključa
+SORT_KEY_READ_LEGACY = os.getenv("SORT_KEY_READ_LEGACY", "1").lower() in ("1", "true")
+
+SEPARATOR = "#"
+
+# Stari ključevi počinju godinom ("2025-..."), a novi s 13 znamenki epohe u ms
+# (od 2001. do 2286. počinju s "1"), pa se rasponi dvaju formata ne preklapaju.
+LEGACY_MIN, LEGACY_MAX = "2", "9"
+COMPACT_MIN, COMPACT_MAX = "0", "1~"
+
+
+def epoch_ms(timestamp):
+    return int(to_seconds(timestamp) * 1000)
+
+
+def compact_key(timestamp, vehicle_id):
+    return f"{epoch_ms(timestamp):013d}{SEPARATOR}{vehicle_id}"
+
+
+def is_compact(sort_key):
+    return sort_key[:13].isdigit() and sort_key[13:14] == SEPARATOR
+
+
+def to_storage(item, sort_key_format=SORT_KEY_FORMAT):
+    if sort_key_format != "compact":
+        return item
+    try:
+        sort_key = compact_key(item["timestamp"], item["vehicle_id"])
+    except ValueError:
+        # Timestamp u nepoznatom formatu ostaje ključ kao i prije
+        return item
+    return dict(item, timestamp=sort_key, reading_time=item["timestamp"])
+
+
+def from_storage(item):
+    """Vraća očitanje s izvornim timestamp stringom, neovisno o formatu ključa."""
+    reading_time = item.pop("reading_time", None)
+    if reading_time is not None:
+        item["timestamp"] = reading_time
+    return item
+
+
+def display_timestamp(item):
+    return item.get("reading_time") or item.get("timestamp") or ""
+
+
+def sort_key_ranges(start=None, end=None):
+    """Rasponi sort ključa (od, do) za vremenski interval, po formatu ključa."""
+    ranges = {}
+    if SORT_KEY_FORMAT != "compact" or SORT_KEY_READ_LEGACY:
+        ranges["legacy"] = (start or LEGACY_MIN, end or LEGACY_MAX)
+    if SORT_KEY_FORMAT == "compact":
+        low = f"{epoch_ms(start):013d}" if start else COMPACT_MIN
+        high = f"{epoch_ms(end) + 999:013d}~" if end else COMPACT_MAX
+        ranges["compact"] = (low, min(high, COMPACT_MAX))
+    return ranges
@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+
+ENTRANCES = ["PULA-ENTRANCE", "RIJEKA-ENTRANCE", "UMAG-ENTRANCE"]
+
+
+def is_true(value) -> bool:
+    return str(value).lower() == "true"
+
+
+class StatsEngine:
+    """Statistika po ulazima koja se ažurira pri svakom upisu očitanja.
+
+    Za svako vozilo pamti se na kojim je ulazima, kamerama i izlazima viđeno,
+    a brojači ulaz→kamera i ulaz→izlaz povećavaju se samo kad se pojavi novi par.
+    Time /stats vraća isti rezultat kao presjek skupova nad cijelom tablicom,
+    ali bez ponovnog skeniranja.
+
+    Snimka se sprema pri gašenju i briše čim se učita, pa nakon pada
+    servera nema zastarjele snimke i statistika se računa iz tablice.
+    """
+
+    STATE = (
+        "vehicle_entrances", "vehicle_cameras", "vehicle_exits", "cameras", "exits",
+        "total_entrances", "passed_cameras", "exited",
+    )
+
+    def __init__(self, snapshot_file: str = None):
+        self.snapshot_file = snapshot_file
+        self.lock = threading.Lock()
+        # Novi izračun u tijeku; dobiva i očitanja upisana za vrijeme skeniranja
+        self.rebuilding = None
+        self.reset()
+
+    def reset(self):
+        self.vehicle_entrances = {}
+        self.vehicle_cameras = {}
+        self.vehicle_exits = {}
+        self.cameras = set()
+        self.exits = set()
+        self.total_entrances = {entrance: 0 for entrance in ENTRANCES}
+        self.passed_cameras = {entrance: {} for entrance in ENTRANCES}
+        self.exited = {entrance: {} for entrance in ENTRANCES}
+
+    def apply(self, item: dict):
+        vehicle_id = item.get("vehicle_id")
+        camera_id = item.get("camera_id")
+        is_entrance = is_true(item.get("is_entrance"))
+        is_camera = is_true(item.get("is_camera"))
+
+        if not vehicle_id or not camera_id:
+            return
+
+        with self.lock:
+            if self.rebuilding:
+                self.rebuilding.apply(item)
+
+            # Vozila na ulazima
+            if is_entrance and camera_id in self.total_entrances:
+                entrances = self.vehicle_entrances.setdefault(vehicle_id, set())
+                if camera_id not in entrances:
+                    entrances.add(camera_id)
+                    self.total_entrances[camera_id] += 1
+                    for cam_id in self.vehicle_cameras.get(vehicle_id, ()):
+                        self._increment(self.passed_cameras[camera_id], cam_id)
+                    for exit_id in self.vehicle_exits.get(vehicle_id, ()):
+                        self._increment(self.exited[camera_id], exit_id)
+
+            # Vozila koja su prošla pored kamera
+            if is_camera:
+                self.cameras.add(camera_id)
+                cameras = self.vehicle_cameras.setdefault(vehicle_id, set())
+                if camera_id not in cameras:
+                    cameras.add(camera_id)
+                    for entrance in self.vehicle_entrances.get(vehicle_id, ()):
+                        self._increment(self.passed_cameras[entrance], camera_id)
+
+            # Vozila koja su izašla
+            if not is_entrance and not is_camera:
+                self.exits.add(camera_id)
+                exits = self.vehicle_exits.setdefault(vehicle_id, set())
+                if camera_id not in exits:
+                    exits.add(camera_id)
+                    for entrance in self.vehicle_entrances.get(vehicle_id, ()):
+                        self._increment(self.exited[entrance], camera_id)
+
+    @staticmethod
+    def _increment(counters: dict, key: str):
+        counters[key] = counters.get(key, 0) + 1
+
+    def rebuild(self, items):
+        """Ponovno izračunavanje iz svih očitanja (npr. skeniranja tablice).
+
+        Računa se u zasebnom objektu, a stari rezultat vrijedi dok novi nije
+        gotov. Očitanje koje stigne i skeniranjem i upisom broji se jednom,
+        jer se parovi broje samo pri prvom pojavljivanju.
+        """
+        fresh = StatsEngine()
+        with self.lock:
+            self.rebuilding = fresh
+        try:
+            for item in items:
+                fresh.apply(item)
+        except Exception:
+            with self.lock:
+                self.rebuilding = None
+            raise
+        with self.lock, fresh.lock:
+            for name in self.STATE:
+                setattr(self, name, getattr(fresh, name))
+            self.rebuilding = None
+
+    def statistics(self) -> dict:
+        with self.lock:
+            detailed_stats = {}
+            for entrance in ENTRANCES:
+                detailed_stats[entrance] = {
+                    "total_entrances": self.total_entrances[entrance],
+                    "passed_cameras": {
+                        cam_id: self.passed_cameras[entrance].get(cam_id, 0)
+                        for cam_id in self.cameras
+                    },
+                    "exited": {
+                        exit_id: self.exited[entrance].get(exit_id, 0)
+                        for exit_id in self.exits
+                    },
+                }
+            return detailed_stats
+
+    def save(self):
+        if not self.snapshot_file:
+            return
+        with self.lock:
+            data = {
+                "vehicle_entrances": {k: sorted(v) for k, v in self.vehicle_entrances.items()},
+                "vehicle_cameras": {k: sorted(v) for k, v in self.vehicle_cameras.items()},
+                "vehicle_exits": {k: sorted(v) for k, v in self.vehicle_exits.items()},
+                "cameras": sorted(self.cameras),
+                "exits": sorted(self.exits),
+                "total_entrances": self.total_entrances,
+                "passed_cameras": self.passed_cameras,
+                "exited": self.exited,
+            }
+        tmp_file = self.snapshot_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_file, self.snapshot_file)
+
+    def load(self) -> bool:
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return False
+        try:
+            with open(self.snapshot_file, "r") as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            print(f"Upozorenje: {self.snapshot_file} je oštećen. Statistika će se ponovno izračunati.")
+            return False
+        # Snimka vrijedi samo do prvog sljedećeg upisa; nova se sprema pri gašenju
+        os.remove(self.snapshot_file)
+
+        with self.lock:
+            self.reset()
+            self.vehicle_entrances = {k: set(v) for k, v in data["vehicle_entrances"].items()}
+            self.vehicle_cameras = {k: set(v) for k, v in data["vehicle_cameras"].items()}
+            self.vehicle_exits = {k: set(v) for k, v in data["vehicle_exits"].items()}
+            self.cameras = set(data["cameras"])
+            self.exits = set(data["exits"])
+            self.total_entrances.update(data["total_entrances"])
+            self.passed_cameras.update(data["passed_cameras"])
+            self.exited.update(data["exited"])
+        return True
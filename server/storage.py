@@ -0,0 +1,155 @@
+import bisect
+import heapq
+import os
+import threading
+
+
+class StorageError(Exception):
+    pass
+
+
+class Storage:
+    """Sučelje spremišta očitanja.
+
+    Sve metode primaju i vraćaju očitanja u obliku koji vidi API (izvorni
+    camera_id i timestamp string). Cursori su JSON-serijalizabilni objekti
+    koje tumači samo spremište koje ih je izdalo.
+    """
+
+    def put(self, item) -> bool:
+        """Upisuje očitanje; False ako je očitanje s istim reading_id već upisano."""
+        return bool(self.put_batch([item]))
+
+    def put_batch(self, items):
+        """Upisuje očitanja i vraća ona koja su upisana (bez duplikata po reading_id)."""
+        raise NotImplementedError
+
+    def delete_batch(self, items):
+        """Briše očitanja (prepoznaju se po kameri, vremenu i vozilu)."""
+        raise NotImplementedError
+
+    def storage_key(self, item):
+        """Ključ pod kojim se očitanje zapisuje, ako očitanje s istim ključem prepisuje ranije; inače None."""
+        return None
+
+    def scan_page(self, limit=None, cursor=None):
+        """Vraća (očitanja, cursor za sljedeću stranicu ili None)."""
+        raise NotImplementedError
+
+    def scan_all(self):
+        cursor = None
+        while True:
+            items, cursor = self.scan_page(None, cursor)
+            yield from items
+            if not cursor:
+                return
+
+    def query_cameras(self, camera_ids, start=None, end=None, limit=100, cursor=None):
+        """Očitanja zadanih kamera u vremenskom rasponu, poredana po vremenu."""
+        raise NotImplementedError
+
+    def query_vehicle(self, vehicle_id):
+        raise NotImplementedError
+
+    def has_entrance_since(self, vehicle_id, cutoff):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemoryStorage(Storage):
+    """Spremište u memoriji procesa, za testove i mjerenja bez baze."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = []
+        self.by_camera = {}
+        self.by_vehicle = {}
+        self.reading_ids = set()
+
+    def put_batch(self, items):
+        written = []
+        with self.lock:
+            for item in items:
+                reading_id = item.get("reading_id")
+                if reading_id:
+                    if reading_id in self.reading_ids:
+                        continue
+                    self.reading_ids.add(reading_id)
+                written.append(item)
+                seq = len(self.items)
+                self.items.append(dict(item))
+                bisect.insort(self.by_camera.setdefault(item["camera_id"], []), (item["timestamp"], seq))
+                self.by_vehicle.setdefault(item["vehicle_id"], []).append(seq)
+        return written
+
+    def delete_batch(self, items):
+        with self.lock:
+            for item in items:
+                positions = self.by_camera.get(item["camera_id"], [])
+                index = bisect.bisect_left(positions, (item["timestamp"], -1))
+                while index < len(positions) and positions[index][0] == item["timestamp"]:
+                    seq = positions[index][1]
+                    if self.items[seq]["vehicle_id"] == item["vehicle_id"]:
+                        self.reading_ids.discard(self.items[seq].get("reading_id"))
+                        # Mjesto u popisu ostaje prazno, da cursori (offset) ostanu ispravni
+                        self.items[seq] = None
+                        del positions[index]
+                        self.by_vehicle[item["vehicle_id"]].remove(seq)
+                    else:
+                        index += 1
+
+    def scan_page(self, limit=None, cursor=None):
+        offset = cursor["offset"] if cursor else 0
+        with self.lock:
+            end = len(self.items) if not limit else min(offset + limit, len(self.items))
+            items = [dict(item) for item in self.items[offset:end] if item is not None]
+            next_cursor = {"offset": end} if end < len(self.items) else None
+        return items, next_cursor
+
+    def query_cameras(self, camera_ids, start=None, end=None, limit=100, cursor=None):
+        after = (cursor["timestamp"], cursor["seq"]) if cursor else None
+        with self.lock:
+            ranges = []
+            for camera_id in camera_ids:
+                positions = self.by_camera.get(camera_id, [])
+                low = bisect.bisect_left(positions, (start, -1)) if start else 0
+                if after:
+                    low = max(low, bisect.bisect_right(positions, after))
+                high = bisect.bisect_right(positions, (end, float("inf"))) if end else len(positions)
+                ranges.append(positions[low:min(high, low + limit)])
+
+            selected = list(heapq.merge(*ranges))[:limit]
+            items = [dict(self.items[seq]) for _, seq in selected]
+
+        next_cursor = None
+        if len(selected) == limit:
+            next_cursor = {"timestamp": selected[-1][0], "seq": selected[-1][1]}
+        return items, next_cursor
+
+    def query_vehicle(self, vehicle_id):
+        with self.lock:
+            return [dict(self.items[seq]) for seq in self.by_vehicle.get(vehicle_id, [])]
+
+    def has_entrance_since(self, vehicle_id, cutoff):
+        with self.lock:
+            for seq in self.by_vehicle.get(vehicle_id, []):
+                item = self.items[seq]
+                if item.get("is_entrance") and item["timestamp"] >= cutoff:
+                    return True
+        return False
+
+
+def create_storage(backend=None):
+    """Spremište prema STORAGE_BACKEND: dynamodb (zadano), sqlite ili memory."""
+    backend = backend or os.getenv("STORAGE_BACKEND", "dynamodb")
+    if backend == "memory":
+        return MemoryStorage()
+    if backend == "sqlite":
+        from storage_sqlite import SqliteStorage
+        return SqliteStorage(os.getenv("SQLITE_PATH", "readings.db"))
+    if backend == "dynamodb":
+        from storage_dynamodb import DynamoStorage
+        return DynamoStorage()
+    raise ValueError(f"Nepoznat STORAGE_BACKEND: {backend}")
@@ -0,0 +1,257 @@
+import heapq
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from dynamo import get_table
+import sharding
+import sort_keys
+from sharding import partition_keys
+from sort_keys import display_timestamp, sort_key_ranges
+from storage import Storage, StorageError
+from storage_keys import from_storage, to_storage
+
+TABLE_NAME = "Readings"
+
+# Upiti po particijama i formatima ključa jedne kamere izvršavaju se usporedno
+FANOUT_WORKERS = int(os.getenv("DB_FANOUT_WORKERS", "16"))
+
+# Transakcija ima najviše 100 akcija, a svako očitanje s reading_id dvije (oznaka i očitanje)
+TRANSACTION_READINGS = 50
+TRANSACTION_RETRIES = 3
+
+# Koliko dugo (u sekundama) se pamti upisani reading_id, tj. do kada se ponovljeno očitanje prepoznaje
+READING_ID_TTL = float(os.getenv("READING_ID_TTL", str(7 * 24 * 3600)))
+
+class DynamoStorage(Storage):
+    """Očitanja u DynamoDB tablici Readings (camera_id + timestamp, indeks po vozilu)."""
+
+    def __init__(self, table_name=TABLE_NAME):
+        import database  # noqa: F401  (stvara tablicu i indeks ako ne postoje)
+
+        self.vehicle_index_name = database.vehicle_index_name
+        self.reading_ids_table_name = database.reading_ids_table_name
+        self.table = get_table(table_name)
+        self.fanout = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="dynamodb-fanout")
+
+    def _put_checked(self, items):
+        """Upisuje očitanja s reading_id transakcijski, svako uz oznaku reading_id.
+
+        Oznaka se upisuje samo ako još ne postoji, pa je očitanje čija oznaka
+        postoji duplikat i ne upisuje se. Vraća upisana očitanja.
+        """
+        pending = list(items)
+        conflicts = 0
+        while pending:
+            expires_at = int(time.time() + READING_ID_TTL)
+            actions = []
+            for item in pending:
+                actions.append({"Put": {
+                    "TableName": self.reading_ids_table_name,
+                    "Item": {"reading_id": item["reading_id"], "expires_at": expires_at},
+                    "ConditionExpression": "attribute_not_exists(reading_id)",
+                }})
+                actions.append({"Put": {"TableName": self.table.name, "Item": to_storage(item)}})
+            try:
+                self.table.transact_write_items(TransactItems=actions)
+                return pending
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "TransactionCanceledException":
+                    raise
+                codes = [reason.get("Code", "None") for reason in e.response.get("CancellationReasons", [])]
+                # Akcije su parovi (oznaka, očitanje), pa je indeks očitanja pola indeksa akcije
+                duplicates = {index // 2 for index, code in enumerate(codes) if code == "ConditionalCheckFailed"}
+                if not duplicates:
+                    # Istodobna transakcija nad istim zapisom: ponavlja se nekoliko puta, ostalo je greška
+                    conflicts += 1
+                    if conflicts > TRANSACTION_RETRIES or set(codes) - {"None", "TransactionConflict"}:
+                        raise
+                    time.sleep(0.05 * 2 ** conflicts)
+                pending = [item for index, item in enumerate(pending) if index not in duplicates]
+        return pending
+
+    def put(self, item):
+        if item.get("reading_id"):
+            return super().put(item)
+        try:
+            self.table.put_item(Item=to_storage(item))
+            return True
+        except ClientError as e:
+            raise StorageError(e.response["Error"]["Message"]) from e
+
+    def storage_key(self, item):
+        stored = to_storage(item)
+        return stored["camera_id"], stored["timestamp"]
+
+    def put_batch(self, items):
+        # Očitanje s istim ključem ili reading_id kao ranije u seriji nije upisano (ni vraćeno):
+        # prepisalo bi ranije očitanje, a u transakciji isti zapis smije biti samo jednom
+        keys = set()
+        ids = set()
+        unique = []
+        for item in items:
+            key = self.storage_key(item)
+            reading_id = item.get("reading_id")
+            if key in keys or (reading_id and reading_id in ids):
+                continue
+            keys.add(key)
+            if reading_id:
+                ids.add(reading_id)
+            unique.append(item)
+
+        checked = [item for item in unique if item.get("reading_id")]
+        chunks = [checked[i:i + TRANSACTION_READINGS] for i in range(0, len(checked), TRANSACTION_READINGS)]
+        try:
+            # batch_writer šalje po 25 stavki i sam ponavlja neobrađene (UnprocessedItems)
+            with self.table.batch_writer() as batch:
+                for item in unique:
+                    if not item.get("reading_id"):
+                        batch.put_item(Item=to_storage(item))
+            # BatchWriteItem ne podržava uvjete, pa očitanja s reading_id idu u transakcijama (usporedno)
+            written = {id(item) for chunk in self.fanout.map(self._put_checked, chunks) for item in chunk}
+        except ClientError as e:
+            raise StorageError(e.response["Error"]["Message"]) from e
+        return [item for item in unique if not item.get("reading_id") or id(item) in written]
+
+    def _delete_reading(self, key, vehicle_id):
+        """Briše zapis pod ključem samo ako je to očitanje istog vozila."""
+        try:
+            self.table.delete_item(Key=key, ConditionExpression=Attr("vehicle_id").eq(vehicle_id))
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+    def delete_batch(self, items):
+        # Uvjetno brisanje, jer stari ključ (kamera + sekunda) može pripadati drugom vozilu
+        deletes = [(key, item["vehicle_id"]) for item in items for key in self._stored_keys(item)]
+        try:
+            list(self.fanout.map(lambda delete: self._delete_reading(*delete), deletes))
+        except ClientError as e:
+            raise StorageError(e.response["Error"]["Message"]) from e
+
+    @staticmethod
+    def _stored_keys(item):
+        """Ključevi pod kojima očitanje može biti zapisano dok migracija ključeva nije gotova.
+
+        Briše se svaki kandidat koji postoji i pripada istom vozilu.
+        """
+        camera_keys = {sharding.partition_key(item["camera_id"], item["vehicle_id"])}
+        if sharding.SHARD_READ_UNSHARDED:
+            camera_keys.add(item["camera_id"])
+        sort_key_values = {sort_keys.to_storage(item)["timestamp"]}
+        if sort_keys.SORT_KEY_READ_LEGACY:
+            sort_key_values.add(item["timestamp"])
+        return [
+            {"camera_id": camera_key, "timestamp": sort_key}
+            for camera_key in sorted(camera_keys)
+            for sort_key in sorted(sort_key_values)
+        ]
+
+    def scan_page(self, limit=None, cursor=None):
+        scan_kwargs = {}
+        if limit:
+            scan_kwargs["Limit"] = limit
+        if cursor:
+            scan_kwargs["ExclusiveStartKey"] = cursor
+        response = self.table.scan(**scan_kwargs)
+        items = [from_storage(item) for item in response.get("Items", [])]
+        return items, response.get("LastEvaluatedKey")
+
+    def _query_camera_page(self, partition_key, low, high, limit=None, start_key=None):
+        """Jedna stranica sirovih (nepretvorenih) očitanja jednog hash ključa u rasponu sort ključa."""
+        query_kwargs = {
+            "KeyConditionExpression": Key("camera_id").eq(partition_key) & Key("timestamp").between(low, high),
+        }
+        if limit:
+            query_kwargs["Limit"] = limit
+        if start_key:
+            query_kwargs["ExclusiveStartKey"] = start_key
+        response = self.table.query(**query_kwargs)
+        return response.get("Items", []), response.get("LastEvaluatedKey")
+
+    def query_cameras(self, camera_ids, start=None, end=None, limit=100, cursor=None):
+        """Paralelni upiti po kamerama (i njihovim particijama) spojeni po vremenu.
+
+        Svaki izvor je jedan hash ključ i jedan format sort ključa. `cursor` je
+        rječnik izvor -> ExclusiveStartKey iz prethodnog poziva; izvori kojih
+        nema u njemu su već pročitani do kraja.
+        """
+        ranges = sort_key_ranges(start, end)
+        sources = {
+            f"{key}|{key_format}": (key, low, high)
+            for camera_id in camera_ids
+            for key in partition_keys(camera_id)
+            for key_format, (low, high) in ranges.items()
+        }
+        cursors = cursor if cursor is not None else dict.fromkeys(sources)
+        active = [source for source in sources if source in cursors]
+
+        pages = list(self.fanout.map(
+            lambda source: self._query_camera_page(*sources[source], limit, cursors[source]),
+            active,
+        ))
+
+        # Spajanje po izvornom vremenu očitanja, jer se sirovi ključevi dvaju formata ne mogu uspoređivati
+        merged = heapq.merge(*[
+            [(display_timestamp(item), source, item["timestamp"], item) for item in items]
+            for source, (items, _) in zip(active, pages)
+        ])
+        data = []
+        consumed = dict.fromkeys(active, 0)
+        for _, source, _, item in merged:
+            if len(data) >= limit:
+                break
+            data.append(item)
+            consumed[source] += 1
+
+        next_cursors = {}
+        for source, (items, last_key) in zip(active, pages):
+            count = consumed[source]
+            if count < len(items):
+                # Stranica izvora nije potrošena do kraja, nastavlja se iza zadnjeg vraćenog očitanja
+                next_cursors[source] = (
+                    {"camera_id": sources[source][0], "timestamp": items[count - 1]["timestamp"]}
+                    if count else cursors[source]
+                )
+            elif last_key:
+                next_cursors[source] = last_key
+
+        return [from_storage(item) for item in data], next_cursors or None
+
+    def query_vehicle(self, vehicle_id):
+        query_kwargs = {
+            "IndexName": self.vehicle_index_name,
+            "KeyConditionExpression": Key("vehicle_id").eq(vehicle_id),
+        }
+        items = []
+        while True:
+            response = self.table.query(**query_kwargs)
+            items.extend(from_storage(item) for item in response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                return items
+            query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def has_entrance_since(self, vehicle_id, cutoff):
+        """Postoji li ulaz vozila od `cutoff` naovamo (upit nad indeksom po vozilu)."""
+        for low, high in sort_key_ranges(cutoff).values():
+            query_kwargs = {
+                "IndexName": self.vehicle_index_name,
+                "KeyConditionExpression": Key("vehicle_id").eq(vehicle_id) & Key("timestamp").between(low, high),
+                "FilterExpression": Attr("is_entrance").eq(True),
+            }
+
+            # Filter se primjenjuje nakon čitanja stranice, pa ulaz može biti na nekoj od sljedećih
+            while True:
+                response = self.table.query(**query_kwargs)
+                if response.get("Items"):
+                    return True
+                if "LastEvaluatedKey" not in response:
+                    break
+                query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        return False
+
+    def close(self):
+        self.fanout.shutdown(wait=True)
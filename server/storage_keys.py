@@ -0,0 +1,17 @@
+import sharding
+import sort_keys
+
+
+def to_storage(item):
+    """Očitanje u obliku u kojem se zapisuje (particija kamere i sort ključ)."""
+    item = sort_keys.to_storage(item)
+    if sharding.SHARD_COUNT <= 1:
+        return item
+    return dict(item, camera_id=sharding.partition_key(item["camera_id"], item["vehicle_id"]))
+
+
+def from_storage(item):
+    camera_id = item.get("camera_id")
+    if camera_id and sharding.SEPARATOR in camera_id:
+        item["camera_id"] = sharding.camera_of(camera_id)
+    return sort_keys.from_storage(item)
@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+import threading
+
+from paging import to_json
+from storage import Storage, StorageError
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    camera_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    vehicle_id TEXT NOT NULL,
+    is_entrance INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL,
+    reading_id TEXT
+);
+CREATE INDEX IF NOT EXISTS readings_camera_time ON readings (camera_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS readings_vehicle_time ON readings (vehicle_id, timestamp);
+"""
+
+# Stvara se nakon dodavanja stupca u bazama starijim od reading_id
+READING_ID_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS readings_reading_id ON readings (reading_id) WHERE reading_id IS NOT NULL"
+)
+
+# Stranica za čitanje bez zadanog limita (scan_all), da se cijela tablica ne čita odjednom
+SCAN_PAGE_SIZE = int(os.getenv("SQLITE_SCAN_PAGE_SIZE", "1000"))
+
+INSERT = (
+    "INSERT INTO readings (camera_id, timestamp, vehicle_id, is_entrance, data, reading_id) VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+class SqliteStorage(Storage):
+    """Ugrađeno SQLite spremište s indeksima po kameri i po vozilu.
+
+    Svaka dretva ima svoju vezu (WAL omogućuje čitanja usporedno s upisom),
+    a upisi unutar procesa idu jedan po jedan.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.write_lock = threading.Lock()
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(readings)")}
+        if "reading_id" not in columns:
+            connection.execute("ALTER TABLE readings ADD COLUMN reading_id TEXT")
+        connection.execute(READING_ID_INDEX)
+        connection.commit()
+
+    def _connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def put_batch(self, items):
+        rows = [
+            (
+                item["camera_id"], item["timestamp"], item["vehicle_id"], int(bool(item.get("is_entrance"))),
+                to_json(item), item.get("reading_id"),
+            )
+            for item in items
+        ]
+        connection = self._connection()
+        try:
+            with self.write_lock, connection:
+                if not any(item.get("reading_id") for item in items):
+                    connection.executemany(INSERT, rows)
+                    return list(items)
+                # Duplikat po reading_id se preskače, pa se broj upisanih redaka provjerava po očitanju
+                written = []
+                for item, row in zip(items, rows):
+                    if connection.execute(INSERT + " ON CONFLICT DO NOTHING", row).rowcount:
+                        written.append(item)
+                return written
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+
+    def delete_batch(self, items):
+        rows = [(item["camera_id"], item["timestamp"], item["vehicle_id"]) for item in items]
+        connection = self._connection()
+        try:
+            with self.write_lock, connection:
+                connection.executemany(
+                    "DELETE FROM readings WHERE camera_id = ? AND timestamp = ? AND vehicle_id = ?", rows,
+                )
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+
+    def scan_page(self, limit=None, cursor=None):
+        after = cursor["id"] if cursor else 0
+        limit = limit or SCAN_PAGE_SIZE
+        rows = self._connection().execute(
+            "SELECT id, data FROM readings WHERE id > ? ORDER BY id LIMIT ?", (after, limit)
+        ).fetchall()
+
+        next_cursor = {"id": rows[-1][0]} if len(rows) == limit else None
+        return [json.loads(data) for _, data in rows], next_cursor
+
+    def query_cameras(self, camera_ids, start=None, end=None, limit=100, cursor=None):
+        placeholders = ", ".join("?" for _ in camera_ids)
+        sql = f"SELECT id, timestamp, data FROM readings WHERE camera_id IN ({placeholders})"
+        params = list(camera_ids)
+        if start:
+            sql += " AND timestamp >= ?"
+            params.append(start)
+        if end:
+            sql += " AND timestamp <= ?"
+            params.append(end)
+        if cursor:
+            sql += " AND (timestamp, id) > (?, ?)"
+            params.extend([cursor["timestamp"], cursor["id"]])
+        sql += " ORDER BY timestamp, id LIMIT ?"
+        params.append(limit)
+        rows = self._connection().execute(sql, params).fetchall()
+
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = {"timestamp": rows[-1][1], "id": rows[-1][0]}
+        return [json.loads(data) for _, _, data in rows], next_cursor
+
+    def query_vehicle(self, vehicle_id):
+        rows = self._connection().execute(
+            "SELECT data FROM readings WHERE vehicle_id = ? ORDER BY timestamp", (vehicle_id,)
+        ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def has_entrance_since(self, vehicle_id, cutoff):
+        row = self._connection().execute(
+            "SELECT 1 FROM readings WHERE vehicle_id = ? AND timestamp >= ? AND is_entrance = 1 LIMIT 1",
+            (vehicle_id, cutoff),
+        ).fetchone()
+        return row is not None
+
+    def close(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+# Oblik vremena u očitanjima (i u parametrima from/to)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_timestamp(timestamp) -> datetime:
+    """Vrijeme iz očitanja; ValueError za bilo koji drugi oblik."""
+    return datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+
+
+def to_seconds(timestamp) -> float:
+    """Sekunde epohe (po lokalnoj zoni) za vrijeme u obliku TIMESTAMP_FORMAT."""
+    return parse_timestamp(timestamp).timestamp()
+
+
+def reading_seconds(item, field="timestamp"):
+    """Sekunde epohe iz polja očitanja, ili None ako vrijeme nije zadano ili je u drugom obliku."""
+    try:
+        return to_seconds(item.get(field) or "")
+    except ValueError:
+        return None
+
+
+def format_timestamp(value: datetime) -> str:
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+def format_seconds(seconds) -> str:
+    return format_timestamp(datetime.fromtimestamp(seconds))
+
+
+def now_timestamp() -> str:
+    return format_timestamp(datetime.now())
+
+
+def expire_before(entries, cutoff, seen_at=lambda value: value):
+    """Briše s početka OrderedDict-a zapise čije je vrijeme (`seen_at(vrijednost)`) prije `cutoff`.
+
+    Zapisi moraju biti (uglavnom) poredani po vremenu, jer se staje na prvom
+    zapisu koji nije istekao.
+    """
+    while entries:
+        if seen_at(next(iter(entries.values()))) >= cutoff:
+            break
+        entries.popitem(last=False)
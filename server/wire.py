@@ -0,0 +1,145 @@
+import json
+import os
+import zlib
+from typing import List
+
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter, ValidationError
+
+from models import Reading
+
+# Najveće tijelo zahtjeva, prije i nakon raspakiravanja (zaštita od "gzip bombe")
+MAX_BODY_BYTES = int(os.getenv("MAX_BODY_BYTES", str(16 * 1024 * 1024)))
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+MSGPACK = "application/msgpack"
+
+# Uobičajeni nazivi istih formata
+MEDIA_TYPES = {
+    JSON: JSON,
+    NDJSON: NDJSON,
+    "application/ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+READING = TypeAdapter(Reading)
+READINGS = TypeAdapter(List[Reading])
+
+
+def error_response(status_code, reason):
+    return JSONResponse(status_code=status_code, content={"status": "error", "reason": reason})
+
+
+def openapi_body(schema):
+    """Opis tijela za /docs, jer ruta čita tijelo sama (FastAPI ga tada ne vidi)."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {media_type: {"schema": schema} for media_type in (JSON, NDJSON, MSGPACK)},
+        }
+    }
+
+
+def _decompress(body, encoding):
+    if encoding in ("", "identity"):
+        return body
+    if encoding not in ("gzip", "x-gzip"):
+        return None
+    # Tijelo može imati više gzip članova (npr. spojene dijelove); čitaju se svi
+    chunks = []
+    remaining = MAX_BODY_BYTES
+    while body:
+        if remaining <= 0:
+            raise OverflowError
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        chunk = decompressor.decompress(body, remaining)
+        if decompressor.unconsumed_tail:
+            raise OverflowError
+        if not decompressor.eof:
+            raise zlib.error("nepotpun gzip član")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+        body = decompressor.unused_data
+    return b"".join(chunks)
+
+
+def _objects(data, media_type):
+    """Sirovi objekti iz NDJSON ili msgpack tijela, jedan po zapisu."""
+    if media_type == NDJSON:
+        return [json.loads(line) for line in data.splitlines() if line.strip()]
+    import msgpack
+
+    unpacker = msgpack.Unpacker(raw=False, max_buffer_size=MAX_BODY_BYTES)
+    try:
+        unpacker.feed(data)
+    except msgpack.BufferFull:
+        raise OverflowError
+    objects = list(unpacker)
+    if unpacker.tell() != len(data):
+        raise ValueError("nepotpun zapis na kraju")
+    return objects
+
+
+async def parse_readings(request, many):
+    """Očitanje (ili popis očitanja za `many`) iz tijela u formatu prema zaglavljima.
+
+    Content-Type: application/json (zadano), application/x-ndjson (jedno
+    očitanje po retku) ili application/msgpack (jedan objekt ili niz
+    objekata); uz bilo koji od njih Content-Encoding: gzip. Vraća
+    (vrijednost, None) ili (None, odgovor s greškom).
+    """
+    content_type = request.headers.get("content-type", JSON).split(";")[0].strip().lower()
+    media_type = MEDIA_TYPES.get(content_type or JSON)
+    if media_type is None:
+        return None, error_response(415, f"nepodržan Content-Type: {content_type}")
+    if media_type == MSGPACK:
+        try:
+            import msgpack  # noqa: F401
+        except ImportError:
+            return None, error_response(415, "msgpack nije instaliran na serveru")
+
+    too_large = error_response(413, f"tijelo je veće od {MAX_BODY_BYTES} bajtova")
+    # Granica vrijedi i za nekomprimirano tijelo, prije čitanja (Content-Length) i prije parsiranja
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        return None, too_large
+    body = await request.body()
+    if len(body) > MAX_BODY_BYTES:
+        return None, too_large
+
+    encoding = request.headers.get("content-encoding", "").strip().lower()
+    try:
+        data = _decompress(body, encoding)
+    except OverflowError:
+        return None, too_large
+    except zlib.error:
+        return None, error_response(400, "tijelo nije ispravan gzip")
+    if data is None:
+        return None, error_response(415, f"nepodržan Content-Encoding: {encoding}")
+
+    adapter = READINGS if many else READING
+    try:
+        if media_type == JSON:
+            # Isto kao FastAPI: parsiranje i provjera u jednom prolazu (pydantic-core)
+            return adapter.validate_json(data), None
+        try:
+            objects = _objects(data, media_type)
+        except OverflowError:
+            return None, too_large
+        except ValueError as e:
+            return None, error_response(400, f"tijelo nije ispravan {media_type}: {e}")
+        if len(objects) == 1 and isinstance(objects[0], list):
+            objects = objects[0]
+        if not many:
+            if len(objects) != 1:
+                return None, error_response(400, "očekivano je jedno očitanje")
+            objects = objects[0]
+        return adapter.validate_python(objects), None
+    except ValidationError as e:
+        # Isti oblik greške 422 kao kad FastAPI sam provjerava tijelo
+        raise RequestValidationError([dict(error, loc=("body", *error["loc"])) for error in e.errors()])
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import deque
+
+
+class WriteBehindQueue:
+    """Ograničeni red očitanja koja pozadinska dretva upisuje u serijama.
+
+    Serija se šalje kad se skupi `batch_size` očitanja ili kad najstarije
+    očitanje u redu čeka dulje od `max_age` sekundi. Kad je red pun,
+    `offer` vraća False pa poziv može odbiti zahtjev (backpressure).
+    Serija koja nije upisana ni nakon `retries` pokušaja predaje se
+    `on_drop`, da pozivatelj može osloboditi ono što je za nju zauzeo.
+    """
+
+    def __init__(self, write_batch, max_size=10000, batch_size=100, max_age=0.5, retries=3, on_drop=None):
+        self.write_batch = write_batch
+        self.on_drop = on_drop
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.retries = retries
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = None
+
+    @property
+    def depth(self) -> int:
+        return len(self.items)
+
+    def start(self):
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self.thread.start()
+
+    def offer(self, items) -> bool:
+        """Dodaje sva očitanja ili nijedno ako za sva nema mjesta."""
+        with self.condition:
+            if self.closed or len(self.items) + len(items) > self.max_size:
+                return False
+            now = time.monotonic()
+            self.items.extend((now, item) for item in items)
+            self.condition.notify()
+            return True
+
+    def stop(self):
+        """Zatvara red i čeka da se upiše sve što je u njemu ostalo."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def _next_batch(self):
+        with self.condition:
+            while not self.closed:
+                if len(self.items) >= self.batch_size:
+                    break
+                if self.items:
+                    remaining = self.items[0][0] + self.max_age - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                else:
+                    self.condition.wait()
+
+            count = min(self.batch_size, len(self.items))
+            return [self.items.popleft()[1] for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._flush(batch)
+
+    def _flush(self, batch):
+        for attempt in range(1, self.retries + 1):
+            try:
+                self.write_batch(batch)
+                return
+            except Exception as e:
+                print(f"Greška pri upisu serije ({len(batch)} očitanja), pokušaj {attempt}/{self.retries}: {e}")
+                time.sleep(0.2 * 2 ** attempt)
+        print(f"Serija od {len(batch)} očitanja nije upisana nakon {self.retries} pokušaja.")
+        if self.on_drop:
+            self.on_drop(batch)